@@ -26,3 +26,38 @@ export const submitQuizAnswer = ({ wordId, quality }) =>
     headers: { 'Content-Type': 'application/json' },
     body: JSON.stringify({ word_id: wordId, quality }),
   }).then((res) => res.json());
+
+// Number of reviews due now (same rule as the stream below)
+export const fetchDueCount = () =>
+  fetch(`${API_BASE_URL}/reviews/due/count/`)
+    .then((res) => res.json())
+    .then((data) => data?.count ?? 0);
+
+// Due reviews streamed as NDJSON: onCard runs as each card arrives.
+// Resolves with the trailer, {next_cursor, count}.
+export const streamDueReviews = async (onCard, { limit, cursor } = {}) => {
+  const params = new URLSearchParams();
+  if (limit) params.set('limit', limit);
+  if (cursor) params.set('cursor', cursor);
+  const res = await fetch(`${API_BASE_URL}/reviews/due/stream/?${params}`);
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = '';
+  let trailer = null;
+  const handleLine = (line) => {
+    if (!line.trim()) return;
+    const item = JSON.parse(line);
+    if ('next_cursor' in item) trailer = item;
+    else onCard(item);
+  };
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffered += decoder.decode(value, { stream: true });
+    const lines = buffered.split('\n');
+    buffered = lines.pop();
+    lines.forEach(handleLine);
+  }
+  handleLine(buffered + decoder.decode());
+  return trailer;
+};
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import { API_BASE_URL } from "../apiConfig";
+import { fetchDueCount } from "../api";
  // Ensure Tailwind CSS is imported
 export default function Dashboard() {
   const [words, setWords] = useState([]);
@@ -38,11 +39,9 @@ export default function Dashboard() {
 
     (async () => {
       try {
-        const r = await fetch(`${API_BASE_URL}/reviews/due/?limit=999`);
-        const data = await r.json();
-        if (!cancelled) {
-          setDueCount(Array.isArray(data?.results) ? data.results.length : 0);
-        }
+        // Counted server-side - no need to download the due cards
+        const count = await fetchDueCount();
+        if (!cancelled) setDueCount(count);
       } catch {
         if (!cancelled) setDueCount(0);
       }
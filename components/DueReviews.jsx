@@ -1,17 +1,41 @@
 // File: src/components/DueReviews.jsx
 import { useEffect, useState } from "react";
-import { API_BASE_URL } from "../apiConfig";
+import { streamDueReviews } from "../api";
 
 export default function DueReviews({ onStartQuiz }) {
   const [items, setItems] = useState([]);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
-    fetch(`${API_BASE_URL}/reviews/due/?limit=30`)
-      .then(r => r.json())
-      .then(d => setItems(d.results || []))
+    let cancelled = false;
+    // Cards show as they stream in; renders are batched per animation frame
+    let pending = [];
+    let frame = null;
+    const flush = () => {
+      frame = null;
+      const cards = pending;
+      pending = [];
+      if (!cancelled && cards.length) {
+        setItems((prev) => prev.concat(cards));
+        setLoading(false);
+      }
+    };
+
+    streamDueReviews((card) => {
+      pending.push(card);
+      if (frame === null) frame = requestAnimationFrame(flush);
+    })
       .catch(console.error)
-      .finally(() => setLoading(false));
+      .finally(() => {
+        if (frame !== null) cancelAnimationFrame(frame);
+        flush();
+        if (!cancelled) setLoading(false);
+      });
+
+    return () => {
+      cancelled = true;
+      if (frame !== null) cancelAnimationFrame(frame);
+    };
   }, []);
 
   if (loading) return <div className="p-4">Loading due reviews…</div>;
@@ -23,9 +47,9 @@ export default function DueReviews({ onStartQuiz }) {
       <ul className="space-y-2">
         {items.map(p => (
           <li key={p.id} className="border rounded p-2">
-            <div className="font-semibold">{p.word}</div>
+            <div className="font-semibold">{p.word_text}</div>
             <div className="text-sm text-slate-600">
-              mastery {p.mastery} • reps {p.repetitions}
+              mastery {p.mastery} • reps {p.review_count}
             </div>
           </li>
         ))}
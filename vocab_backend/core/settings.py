@@ -52,6 +52,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so it compresses the final body (when Accept-Encoding has gzip);
+    # live NDJSON streams are left uncompressed so lines arrive as written
+    'vocab.middleware.GZipExceptLiveStreamsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,6 +75,19 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# The app runs on another origin - let it read the catalog version
+# (needed to start ?since= delta syncs after a full fetch)
+CORS_EXPOSE_HEADERS = ["X-Catalog-Version"]
+
+# Picked by the Accept header; JSON stays the default
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'vocab.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'vocab.renderers.MessagePackRenderer',
+    ],
+}
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -143,3 +159,27 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# Live quiz session state is held in the "quiz_sessions" cache and written
+# back to the database every QUIZ_SESSION_FLUSH_EVERY answers, after
+# QUIZ_SESSION_FLUSH_SECONDS, and on completion. LocMemCache is fine for
+# runserver; use a shared backend (FileBasedCache, Redis, Memcached) when
+# running several worker processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'quiz_sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'quiz-sessions',
+        'TIMEOUT': 6 * 60 * 60,
+    },
+}
+
+QUIZ_SESSION_CACHE = 'quiz_sessions'
+QUIZ_SESSION_FLUSH_EVERY = 10
+QUIZ_SESSION_FLUSH_SECONDS = 60
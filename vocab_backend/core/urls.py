@@ -15,17 +15,24 @@ from vocab.views import (
     quiz_dashboard,
     start_adaptive_quiz,
     get_adaptive_question,
+    get_adaptive_questions,
     submit_adaptive_answer,
+    sync_adaptive_answers,
     complete_adaptive_quiz_session,
     
     # MODULAR COMPONENTS SUPPORT
     mark_word_read,
     get_words_by_criteria,
+    search_catalog,
+    autocomplete_words,
     groups_with_progress,
     
     # LEGACY ENDPOINTS - Keep for compatibility
     mark_read,
     reviews_due,
+    reviews_due_count,
+    reviews_due_stream,
+    export_dataset,
     groups_summary,
     group_words,
     user_low_mastery,
@@ -59,7 +66,9 @@ urlpatterns = [
     # Adaptive Quiz System - Handles ALL quiz types
     path("api/quiz/adaptive/start/", start_adaptive_quiz, name="start-adaptive-quiz"),
     path("api/quiz/adaptive/<int:session_id>/question/", get_adaptive_question, name="get-adaptive-question"),
+    path("api/quiz/adaptive/<int:session_id>/questions/", get_adaptive_questions, name="get-adaptive-questions"),
     path("api/quiz/adaptive/<int:session_id>/answer/", submit_adaptive_answer, name="submit-adaptive-answer"),
+    path("api/quiz/adaptive/<int:session_id>/answers/sync/", sync_adaptive_answers, name="sync-adaptive-answers"),
     path("api/quiz/adaptive/<int:session_id>/complete/", complete_adaptive_quiz_session, name="complete-adaptive-quiz"),
     
     # ============================================================================
@@ -69,6 +78,8 @@ urlpatterns = [
     # Word management for ReadMode, QuizMode combinations
     path("api/words/mark-read/", mark_word_read, name="mark-word-read"),
     path("api/words/by-criteria/", get_words_by_criteria, name="words-by-criteria"),
+    path("api/words/search/", search_catalog, name="words-search"),
+    path("api/words/autocomplete/", autocomplete_words, name="words-autocomplete"),
     path("api/groups/detailed/", groups_with_progress, name="groups-detailed"),
     
     # ============================================================================
@@ -78,6 +89,9 @@ urlpatterns = [
     # Spaced repetition (legacy)
     path("api/words/mark-read-legacy/", mark_read, name="mark-read-legacy"),
     path("api/reviews/due/", reviews_due, name="reviews-due"),
+    path("api/reviews/due/count/", reviews_due_count, name="reviews-due-count"),
+    path("api/reviews/due/stream/", reviews_due_stream, name="reviews-due-stream"),
+    path("api/export/<slug:dataset>.<slug:fmt>", export_dataset, name="export-dataset"),
     
     # Groups (legacy)
     path("api/groups/summary/", groups_summary, name="groups-summary"),
@@ -149,7 +163,10 @@ NEW ADAPTIVE SYSTEM USAGE:
 
 3. QUIZ FLOW:
    GET /api/quiz/adaptive/{session_id}/question/
+   GET /api/quiz/adaptive/{session_id}/questions/?n=10   (prefetch a batch)
    POST /api/quiz/adaptive/{session_id}/answer/
+   POST /api/quiz/adaptive/{session_id}/answer/?include_next=1   (answer + next question)
+   POST /api/quiz/adaptive/{session_id}/answers/sync/   (replay answers queued offline)
    POST /api/quiz/adaptive/{session_id}/complete/
 
 MODULAR COMPONENTS SUPPORT:
@@ -167,6 +184,13 @@ MODULAR COMPONENTS SUPPORT:
    
    # CycleMode combination
    GET /api/words/by-criteria/?group=1&mastery_max=2
+   
+   # Keyset pagination - start with an empty cursor, then pass next_cursor
+   GET /api/words/by-criteria/?group=1&cursor=&limit=30
+   GET /api/words/by-criteria/?group=1&cursor=<next_cursor>&limit=30
+   
+   # Only some fields, as parallel arrays (also works on /api/words/)
+   GET /api/words/by-criteria/?group=1&fields=word,meaning,mastery&shape=columnar
 
 2. MARK WORDS AS READ:
    POST /api/words/mark-read/
@@ -175,6 +199,29 @@ MODULAR COMPONENTS SUPPORT:
 3. GROUP PROGRESS:
    GET /api/groups/detailed/
 
+4. SEARCH (ranked, highlighted, with your mastery):
+   GET /api/words/search/?q=ephem&limit=20
+   # As-you-type completions (one-typo matches fill short lists)
+   GET /api/words/autocomplete/?q=ephm&limit=10
+
+5. WORD CATALOG SYNC:
+   # Full (optionally paged) fetch - note the X-Catalog-Version header
+   GET /api/words/?limit=500&offset=0
+   # Afterwards only what changed: {"version", "updated": [...], "deleted": [ids]}
+   GET /api/words/?since=<version>
+
+6. DUE REVIEW QUEUE (NDJSON, streamed - one card per line):
+   GET /api/reviews/due/stream/
+   # Paged: the last line is {"next_cursor": ..., "count": n}
+   GET /api/reviews/due/stream/?limit=50&cursor=<next_cursor>
+   # Just the number of due cards: {"count": n}
+   GET /api/reviews/due/count/
+
+7. EXPORTS (streamed; also `manage.py export_data`):
+   GET /api/export/words.csv
+   GET /api/export/progress.ndjson
+   GET /api/export/attempts.csv
+
 LEGACY COMPATIBILITY:
 - All old endpoints still work
 - Old quiz endpoints redirect to new system
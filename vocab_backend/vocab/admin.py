@@ -5,7 +5,7 @@
 from django.contrib import admin
 from .models import (
     Word, UserWordProgress, GroupProgress, QuizSession, 
-    QuizAttempt, ReviewSession, UserStreak, MathQuestion
+    QuizAttempt, ReviewSession, UserStreak, MathQuestion, UserStats
 )
 
 # ============================================================================
@@ -254,6 +254,11 @@ admin.site.index_title = "Welcome to Vocabulary Learning System Administration"
 # Add some custom admin actions
 def reset_user_progress(modeladmin, request, queryset):
     """Reset selected user progress records"""
+    # (user, group) -> [(mastery_before, 0), ...] for the group counters
+    group_changes = {}
+    for user_id, group_number, mastery in queryset.values_list(
+            'user_id', 'word__group_number', 'mastery'):
+        group_changes.setdefault((user_id, group_number), []).append((mastery, 0))
     updated = queryset.update(
         mastery=0, 
         times_asked=0, 
@@ -262,6 +267,11 @@ def reset_user_progress(modeladmin, request, queryset):
         is_learning=True,
         marked_for_review=False
     )
+    # Bulk updates bypass the dashboard counters - recount them
+    for user_id in {user_id for user_id, _ in group_changes}:
+        UserStats.reconcile_user(user_id)
+    for (user_id, group_number), changes in group_changes.items():
+        GroupProgress.record_changes(user_id, group_number, changes)
     modeladmin.message_user(request, f'{updated} progress records reset.')
 
 reset_user_progress.short_description = "Reset selected user progress"
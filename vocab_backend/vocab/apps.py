@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class VocabConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vocab'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,94 @@
+# ============================================================================
+# AUTOCOMPLETE - In-memory prefix index over Word.word
+# ============================================================================
+#
+# Lowercased words are kept in one sorted array; a prefix lookup is two
+# bisects. When a prefix has too few completions, every single-edit variant
+# of the typed text (delete, transpose, replace, insert) is looked up the
+# same way, which finds words whose start is one typo away.
+#
+# The arrays are rebuilt lazily: notify_catalog_change invalidates them in
+# this process, and the catalog version is re-checked every few seconds to
+# pick up writes made by other processes.
+
+from bisect import bisect_left
+
+from .catalog_index import CatalogIndex
+from .models import Word
+
+# Past this length a typed query is matched exactly by prefix only
+MAX_FUZZY_QUERY = 32
+
+# Sorts after every real character - upper bound of a prefix range
+PREFIX_END = '\U0010ffff'
+
+
+def edit_variants(text, alphabet):
+    """Every string one edit away from text"""
+    splits = [(text[:i], text[i:]) for i in range(len(text) + 1)]
+    variants = set()
+    for left, right in splits:
+        if right:
+            variants.add(left + right[1:])  # Delete
+            for ch in alphabet:
+                variants.add(left + ch + right[1:])  # Replace
+        if len(right) > 1:
+            variants.add(left + right[1] + right[0] + right[2:])  # Transpose
+        for ch in alphabet:
+            variants.add(left + ch + right)  # Insert
+    variants.discard(text)
+    variants.discard('')
+    return variants
+
+
+class AutocompleteIndex(CatalogIndex):
+    """Process-level sorted (lowercase word, id, word, group) arrays"""
+
+    def _build(self):
+        rows = Word.objects.order_by().values_list('id', 'word', 'group_number')
+        items = sorted(
+            (word.lower(), word_id, word, group_number)
+            for word_id, word, group_number in rows.iterator(chunk_size=2000)
+        )
+        keys = [item[0] for item in items]
+        entries = [item[1:] for item in items]
+        alphabet = ''.join(sorted({ch for key in keys for ch in key}))
+        return keys, entries, alphabet
+
+    def _prefix_range(self, keys, prefix):
+        return bisect_left(keys, prefix), bisect_left(keys, prefix + PREFIX_END)
+
+    def complete(self, query, limit=10, fuzzy=True):
+        """[{'id', 'word', 'group_number', 'distance'}, ...] best first
+
+        Exact prefix completions come first (alphabetical); typo matches
+        (distance 1) fill any remaining slots, shortest words first.
+        """
+        keys, entries, alphabet = self._ensure_built()
+        prefix = query.strip().lower()
+        if not prefix:
+            return []
+
+        start, end = self._prefix_range(keys, prefix)
+        found = [(0, i) for i in range(start, min(end, start + limit))]
+
+        if fuzzy and len(found) < limit and len(prefix) <= MAX_FUZZY_QUERY:
+            seen = set(range(start, end))
+            candidates = []
+            for variant in edit_variants(prefix, alphabet):
+                v_start, v_end = self._prefix_range(keys, variant)
+                for i in range(v_start, min(v_end, v_start + limit)):
+                    if i not in seen:
+                        seen.add(i)
+                        candidates.append(i)
+            candidates.sort(key=lambda i: (len(keys[i]), keys[i]))
+            found += [(1, i) for i in candidates[:limit - len(found)]]
+
+        return [
+            {'id': entries[i][0], 'word': entries[i][1],
+             'group_number': entries[i][2], 'distance': distance}
+            for distance, i in found
+        ]
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,49 @@
+# ============================================================================
+# CATALOG INDEX - Base for process-level caches built from the word catalog
+# ============================================================================
+#
+# Subclasses implement _build(); the result is kept until notify_catalog_change
+# invalidates it in this process, or until a periodic CatalogVersion check
+# shows that another process changed the catalog content.
+
+import threading
+import time
+
+from .models import CatalogVersion
+
+
+class CatalogIndex:
+    """Lazily built, catalog-version-checked in-memory data"""
+
+    # Seconds between catalog version checks (cross-process changes)
+    VERSION_CHECK_SECONDS = 5
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+        self._version = None  # Catalog content version _data was built at
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        """Forget the built data (catalog changed) - rebuilt on next use"""
+        with self._lock:
+            self._data = None
+
+    def _build(self):
+        raise NotImplementedError
+
+    def _ensure_built(self):
+        data = self._data
+        now = time.monotonic()
+        if data is not None and now - self._checked_at < self.VERSION_CHECK_SECONDS:
+            return data
+        with self._lock:
+            if self._data is not None and now - self._checked_at >= self.VERSION_CHECK_SECONDS:
+                if CatalogVersion.content() != self._version:
+                    self._data = None
+                self._checked_at = now
+            if self._data is None:
+                self._version = CatalogVersion.content()
+                self._data = self._build()
+                self._checked_at = now
+            return self._data
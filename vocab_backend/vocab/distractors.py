@@ -0,0 +1,77 @@
+# ============================================================================
+# DISTRACTOR INDEX - Wrong-answer meanings for multiple choice questions
+# ============================================================================
+#
+# Every non-empty meaning is held with its word ID, so building the options
+# for a question never loads Word rows. Sampling is random probing, with a
+# full scan only when the catalog is too small for probes to find enough.
+#
+# Catalog writes in this process drop the pool right away; writes from other
+# processes are noticed through CatalogVersion within a few seconds.
+
+import random
+
+from .catalog_index import CatalogIndex
+from .models import Word
+
+
+class DistractorIndex(CatalogIndex):
+    """Process-level parallel arrays of word IDs and their meanings"""
+
+    # Random probes before falling back to a full scan (tiny catalogs)
+    MAX_PROBES = 32
+
+    def _build(self):
+        ids, meanings = [], []
+        rows = Word.objects.order_by().values_list('id', 'meaning')
+        for word_id, meaning in rows.iterator(chunk_size=2000):
+            meaning = (meaning or '').strip()
+            if meaning:
+                ids.append(word_id)
+                meanings.append(meaning)
+        positions = {word_id: i for i, word_id in enumerate(ids)}
+        return ids, meanings, positions
+
+    def sample(self, exclude_id, exclude_meaning, k=3, preferred_ids=()):
+        """Sample k distinct meanings, skipping the correct word/meaning
+
+        preferred_ids (e.g. confusable neighbors) are drawn first, in random
+        order; any shortfall is filled with uniformly random meanings.
+        """
+        ids, meanings, positions = self._ensure_built()
+        size = len(ids)
+
+        picked = []
+        seen = {exclude_meaning}
+        preferred = list(preferred_ids)
+        random.shuffle(preferred)
+        for word_id in preferred:
+            if len(picked) >= k:
+                break
+            pos = positions.get(word_id)  # None if deleted or meaningless
+            if pos is None or word_id == exclude_id or meanings[pos] in seen:
+                continue
+            seen.add(meanings[pos])
+            picked.append(meanings[pos])
+
+        for _ in range(self.MAX_PROBES):
+            if len(picked) >= k or size == 0:
+                break
+            pos = random.randrange(size)
+            if ids[pos] == exclude_id or meanings[pos] in seen:
+                continue
+            seen.add(meanings[pos])
+            picked.append(meanings[pos])
+
+        if len(picked) < k:
+            # Few usable candidates - scan them all once
+            remaining = [
+                m for i, m in enumerate(meanings)
+                if ids[i] != exclude_id and m not in seen
+            ]
+            remaining = list(dict.fromkeys(remaining))
+            picked.extend(random.sample(remaining, min(k - len(picked), len(remaining))))
+        return picked
+
+
+distractor_index = DistractorIndex()
@@ -0,0 +1,82 @@
+# ============================================================================
+# EXPORTS - Streamed NDJSON / CSV dumps of the catalog and a user's history
+# ============================================================================
+#
+# Rows come off a chunked database iterator as plain tuples and are encoded
+# one at a time, so memory stays constant however many rows are exported.
+# The same generators feed the HTTP export view and the export_data command.
+
+import csv
+from datetime import date
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import Word, UserWordProgress, QuizAttempt
+
+# Rows fetched from the database cursor per round trip
+EXPORT_CHUNK = 2000
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+def _columns(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+def _words(user):
+    return Word.objects.order_by('id'), _columns(Word)
+
+def _progress(user):
+    return (UserWordProgress.objects.filter(user=user).order_by('id'),
+            _columns(UserWordProgress))
+
+def _attempts(user):
+    return (QuizAttempt.objects.filter(session__user=user).order_by('id'),
+            _columns(QuizAttempt))
+
+# name -> (queryset builder, whether it is per user)
+DATASETS = {
+    'words': (_words, False),
+    'progress': (_progress, True),
+    'attempts': (_attempts, True),
+}
+
+
+class _Echo:
+    """File-like object whose write() returns the line instead of buffering"""
+
+    def write(self, value):
+        return value
+
+
+def _rows(queryset, columns):
+    return queryset.values_list(*columns).iterator(chunk_size=EXPORT_CHUNK)
+
+# One shared encoder - json.dumps(cls=...) would build one per value
+_encode = JSONEncoder().encode
+
+def ndjson_lines(queryset, columns):
+    for row in _rows(queryset, columns):
+        yield _encode(dict(zip(columns, row))) + '\n'
+
+def _cell(value):
+    # Nested JSON (examples, tags, ...) goes into one cell as JSON text
+    if isinstance(value, (list, dict)):
+        return _encode(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+def csv_lines(queryset, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in _rows(queryset, columns):
+        yield writer.writerow([_cell(value) for value in row])
+
+def export_lines(dataset, fmt, user=None):
+    """Generator of encoded lines - KeyError for unknown dataset/format"""
+    build, _ = DATASETS[dataset]
+    writer = {'ndjson': ndjson_lines, 'csv': csv_lines}[fmt]
+    return writer(*build(user))
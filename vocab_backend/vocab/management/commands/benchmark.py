@@ -0,0 +1,148 @@
+import gzip
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from vocab.autocomplete import autocomplete_index
+from vocab.models import Word, UserWordProgress, GroupProgress
+from vocab.renderers import FastJSONRenderer, MessagePackRenderer
+from vocab.views import WordViewSet, get_words_by_criteria
+
+
+def make_group(words):
+    """Throwaway user plus a fully mastered group of `words` words"""
+    user = get_user_model().objects.create(username=f"benchmark-{time.time_ns()}")
+    group_number = (Word.objects.aggregate(top=Max('group_number'))['top'] or 0) + 1
+    created = Word.objects.bulk_create([
+        Word(word=f"benchmark-{group_number}-{i}", meaning=f"benchmark meaning {i}",
+             group_number=group_number)
+        for i in range(words)
+    ])
+    # Spread mastery over every review band at or above the threshold
+    UserWordProgress.objects.bulk_create([
+        UserWordProgress(user=user, word=word, mastery=3 + i % 10)
+        for i, word in enumerate(created)
+    ])
+    group = GroupProgress.objects.create(user=user, group_number=group_number,
+                                         mastery_threshold=3)
+    return group
+
+
+def complete_group_per_row(group):
+    """The old per-record scheduling loop, kept for comparison"""
+    for progress in UserWordProgress.objects.filter(
+        user_id=group.user_id, word__group_number=group.group_number,
+        mastery__gte=group.mastery_threshold
+    ):
+        progress.due_date = progress.calculate_next_due_date()
+        progress.marked_for_review = True
+        progress.save()
+
+
+def bench_complete_group(options):
+    group = make_group(options['words'])
+    return lambda: group.check_and_update_completion()
+
+
+def bench_complete_group_per_row(options):
+    group = make_group(options['words'])
+    return lambda: complete_group_per_row(group)
+
+
+def bench_autocomplete(options):
+    """Every keystroke of typing each word, plus a typo of each"""
+    group = make_group(options['words'])
+    autocomplete_index.invalidate()
+    autocomplete_index.complete('warm up')
+    words = list(Word.objects.filter(group_number=group.group_number)
+                 .values_list('word', flat=True))
+    typed = [word[:n] for word in words for n in range(1, len(word) + 1)]
+    typed += [word[1] + word[0] + word[2:] for word in words]
+
+    def run():
+        for text in typed:
+            autocomplete_index.complete(text)
+    return run
+
+
+ENDPOINTS = {
+    'words': lambda group: WordViewSet.as_view({'get': 'list'}),
+    'by_criteria': lambda group: get_words_by_criteria,
+}
+
+ENDPOINT_PARAMS = {
+    'words': lambda group: {},
+    'by_criteria': lambda group: {'group': group.group_number, 'limit': 10**6},
+}
+
+RENDERERS = {
+    'json': lambda data: JSONRenderer().render(data),
+    'fastjson': lambda data: FastJSONRenderer().render(data),
+    'fastjson_gzip': lambda data: gzip.compress(FastJSONRenderer().render(data), 6),
+    'msgpack': lambda data: MessagePackRenderer().render(data),
+}
+
+
+def bench_render(endpoint, renderer):
+    """Encode one endpoint's response data - reports the body size"""
+    def build(options):
+        group = make_group(options['words'])
+        request = APIRequestFactory().get('/', ENDPOINT_PARAMS[endpoint](group))
+        data = ENDPOINTS[endpoint](group)(request).data
+        return lambda: RENDERERS[renderer](data)
+    return build
+
+
+SCENARIOS = {
+    **{f'render_{endpoint}_{renderer}': bench_render(endpoint, renderer)
+       for endpoint in ENDPOINTS for renderer in RENDERERS},
+    'autocomplete': bench_autocomplete,
+    'complete_group': bench_complete_group,
+    'complete_group_per_row': bench_complete_group_per_row,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time hot paths against throwaway data. Every run happens inside a "
+        "transaction that is rolled back, so the database is left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "scenarios", nargs="*",
+            help=f"Scenarios to run (default: all): {', '.join(sorted(SCENARIOS))}"
+        )
+        parser.add_argument("--words", type=int, default=1000,
+                            help="Words in the generated group (default: 1000)")
+        parser.add_argument("--repeat", type=int, default=3,
+                            help="Runs per scenario (default: 3)")
+
+    def handle(self, *args, **options):
+        unknown = set(options["scenarios"]) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+        for name in options["scenarios"] or sorted(SCENARIOS):
+            timings = []
+            for _ in range(options["repeat"]):
+                with transaction.atomic():
+                    run = SCENARIOS[name](options)
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        result = run()
+                        timings.append((time.perf_counter() - started) * 1000)
+                    transaction.set_rollback(True)
+
+            size = f"  {len(result):,} bytes" if isinstance(result, bytes) else ""
+            self.stdout.write(
+                f"{name:<32} median {statistics.median(timings):8.1f} ms  "
+                f"min {min(timings):8.1f} ms  {len(queries)} queries{size}"
+            )
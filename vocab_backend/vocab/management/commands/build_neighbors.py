@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from vocab.neighbors import NEIGHBOR_K, build_neighbor_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the confusable-word index used for hard quiz distractors. "
+        "By default only words without neighbors (e.g. new add_words_bulk "
+        "imports) are processed; use --full to rebuild everything."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true",
+                            help="Recompute neighbors for every word")
+        parser.add_argument("-k", type=int, default=NEIGHBOR_K,
+                            help="Neighbors stored per word")
+
+    def handle(self, *args, **options):
+        built, updated = build_neighbor_index(full=options["full"], k=options["k"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Built neighbors for {built} words, updated {updated} existing lists"
+        ))
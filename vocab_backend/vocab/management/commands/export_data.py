@@ -0,0 +1,57 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from vocab.exports import DATASETS, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a dataset (the word catalog, or one user's progress or quiz "
+        "attempts) to a file or stdout as NDJSON or CSV, in constant memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", help=f"One of: {', '.join(DATASETS)}")
+        parser.add_argument("--format", dest="fmt", default="ndjson",
+                            help=f"One of: {', '.join(FORMATS)} (default: ndjson)")
+        parser.add_argument("--user", dest="username",
+                            help="Whose progress/attempts to export")
+        parser.add_argument("--output", "-o",
+                            help="File to write (default: stdout)")
+
+    def handle(self, *args, **options):
+        dataset, fmt = options["dataset"], options["fmt"]
+        if dataset not in DATASETS:
+            raise CommandError(f"Unknown dataset: {dataset}")
+        if fmt not in FORMATS:
+            raise CommandError(f"Unknown format: {fmt}")
+
+        user = None
+        if DATASETS[dataset][1]:
+            if not options["username"]:
+                raise CommandError(f"--user is required for {dataset}")
+            try:
+                user = get_user_model().objects.get(username=options["username"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No such user: {options['username']}")
+
+        rows = 0
+        # newline='' - the csv module writes its own \r\n line endings
+        out = open(options["output"], "w", newline="", encoding="utf-8") \
+            if options["output"] else sys.stdout
+        try:
+            for line in export_lines(dataset, fmt, user):
+                out.write(line)
+                rows += 1
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+        if fmt == "csv":
+            rows -= 1  # Header
+        if options["output"]:
+            self.stdout.write(self.style.SUCCESS(
+                f"Exported {rows} {dataset} rows to {options['output']}"
+            ))
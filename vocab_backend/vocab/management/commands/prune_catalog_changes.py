@@ -0,0 +1,25 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vocab.models import CatalogChange
+
+
+class Command(BaseCommand):
+    help = (
+        "Drop catalog change-log entries older than the retention window. "
+        "Clients syncing from before it get 410 and refetch the catalog. "
+        "Run nightly (e.g. from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=CatalogChange.RETENTION.days,
+            help=f"Keep this many days of changes (default: {CatalogChange.RETENTION.days})"
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 0:
+            raise CommandError("--days cannot be negative")
+        deleted = CatalogChange.prune(timedelta(days=options["days"]))
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} catalog change entries"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from vocab.search import fts_enabled, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-index the whole word catalog into the FTS5 search table, e.g. "
+        "after raw SQL imports that bypassed notify_catalog_change."
+    )
+
+    def handle(self, *args, **options):
+        if not fts_enabled():
+            self.stdout.write(self.style.WARNING(
+                "FTS5 table not available - search uses the LIKE fallback"
+            ))
+            return
+        indexed = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} words"))
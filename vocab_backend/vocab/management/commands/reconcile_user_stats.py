@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from vocab.models import UserStats, GroupProgress
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every user's dashboard counters and group progress from "
+        "their progress and sessions, fixing any drift. Run nightly (e.g. "
+        "from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", action="append", dest="usernames",
+            help="Only reconcile this username (repeatable)"
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by("pk")
+        if options["usernames"]:
+            users = users.filter(username__in=options["usernames"])
+
+        reconciled = 0
+        for user in users.iterator():
+            UserStats.reconcile_user(user.pk)
+            # Also picks up mastery_threshold edits made in the admin
+            for group in GroupProgress.objects.filter(user=user):
+                group.check_and_update_completion()
+            reconciled += 1
+        self.stdout.write(self.style.SUCCESS(f"Reconciled stats for {reconciled} users"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from vocab.models import WordStatShard
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold sharded answer counters into Word.total_attempts and "
+        "Word.total_correct. Run periodically (e.g. from cron)."
+    )
+
+    def handle(self, *args, **options):
+        updated = WordStatShard.rollup()
+        self.stdout.write(self.style.SUCCESS(f"Rolled up stats for {updated} words"))
@@ -0,0 +1,23 @@
+# ============================================================================
+# MIDDLEWARE - gzip that leaves live NDJSON streams alone
+# ============================================================================
+#
+# GZipMiddleware compresses streaming responses too, but zlib only emits a
+# block once enough input has built up. A client reading an NDJSON stream
+# line by line would get nothing until then. Downloads (Content-Disposition:
+# attachment, e.g. the exports) are still compressed.
+
+from django.middleware.gzip import GZipMiddleware
+
+LIVE_STREAM_TYPES = ('application/x-ndjson',)
+
+
+class GZipExceptLiveStreamsMiddleware(GZipMiddleware):
+    """GZipMiddleware, minus inline NDJSON streams"""
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip()
+        if (response.streaming and content_type in LIVE_STREAM_TYPES
+                and not response.get('Content-Disposition', '').startswith('attachment')):
+            return response
+        return super().process_response(request, response)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0015_word_word_grouping'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizsession',
+            name='plan_cursor',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quizsession',
+            name='question_plan',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0016_quizsession_question_plan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordNeighbors',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('neighbors', models.JSONField(default=list)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('word', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='neighbors', to='vocab.word')),
+            ],
+        ),
+    ]
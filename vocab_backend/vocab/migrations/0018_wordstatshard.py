@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0017_wordneighbors'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordStatShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.SmallIntegerField()),
+                ('attempts', models.IntegerField(default=0)),
+                ('correct', models.IntegerField(default=0)),
+                ('word', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stat_shards', to='vocab.word')),
+            ],
+            options={
+                'unique_together': {('word', 'shard')},
+            },
+        ),
+    ]
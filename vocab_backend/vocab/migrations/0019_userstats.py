@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0018_wordstatshard'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('struggling', models.IntegerField(default=0)),
+                ('learning', models.IntegerField(default=0)),
+                ('practicing', models.IntegerField(default=0)),
+                ('mastered', models.IntegerField(default=0)),
+                ('total_studied', models.IntegerField(default=0)),
+                ('low_mastery_count', models.IntegerField(default=0)),
+                ('due_count', models.IntegerField(default=0)),
+                ('next_due_at', models.DateTimeField(blank=True, null=True)),
+                ('daily_totals', models.JSONField(default=dict)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Creates the SQLite FTS5 mirror of the word catalog used by vocab.search.
+# On other databases (or SQLite without FTS5) this is a no-op and search
+# falls back to icontains lookups.
+#
+# The SQL is frozen here on purpose - later edits to vocab.search must not
+# change what this migration does.
+
+from django.db import migrations
+
+CREATE_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS vocab_word_fts USING fts5("
+    "word, meaning, etymology, story_mnemonic, examples, "
+    "tokenize='porter unicode61 remove_diacritics 2')"
+)
+INSERT = (
+    "INSERT INTO vocab_word_fts (rowid, word, meaning, etymology, story_mnemonic, examples) "
+    "VALUES (%s, %s, %s, %s, %s, %s)"
+)
+BATCH_SIZE = 500
+
+
+def fts_supported(connection):
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if cursor.fetchone()[0]:
+            return True
+        cursor.execute("SELECT 1 FROM pragma_module_list WHERE name = 'fts5'")
+        return cursor.fetchone() is not None
+
+
+def example_text(examples):
+    if not isinstance(examples, list):
+        return ''
+    return '\n'.join(
+        item['text'] for item in examples
+        if isinstance(item, dict) and isinstance(item.get('text'), str)
+    )
+
+
+def create_fts_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if not fts_supported(connection):
+        return
+    Word = apps.get_model('vocab', 'Word')
+    rows = Word.objects.using(connection.alias).order_by('id').values_list(
+        'id', 'word', 'meaning', 'etymology', 'story_mnemonic', 'examples'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_TABLE)
+        batch = []
+        for *row, examples in rows.iterator(chunk_size=BATCH_SIZE):
+            batch.append((*row, example_text(examples)))
+            if len(batch) >= BATCH_SIZE:
+                cursor.executemany(INSERT, batch)
+                batch = []
+        if batch:
+            cursor.executemany(INSERT, batch)
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("DROP TABLE IF EXISTS vocab_word_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0021_catalogchange'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0022_word_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['session', 'word'], name='attempt_session_word_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userwordprogress',
+            index=models.Index(condition=models.Q(('marked_for_review', True)), fields=['user', 'due_date', 'word', 'marked_for_review'], name='uwp_user_review_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userwordprogress',
+            index=models.Index(condition=models.Q(('mastery__lte', 0)), fields=['user', 'mastery', 'word'], name='uwp_user_low_mastery_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:44
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0023_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='word',
+            index=models.Index(django.db.models.functions.text.Lower('word'), name='word_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:19
+
+from django.db import migrations, models
+
+
+def start_at_version(apps, schema_editor):
+    # Every change so far was a content change
+    CatalogVersion = apps.get_model('vocab', 'CatalogVersion')
+    CatalogVersion.objects.update(content_version=models.F('version'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocab', '0025_catalogchange_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogversion',
+            name='content_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(start_at_version, migrations.RunPython.noop),
+    ]
@@ -2,7 +2,9 @@
 # FIXED MODELS.PY - Added missing function for migration compatibility
 # ============================================================================
 
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Q, Count, Min, Max, Sum, Value, Case, When, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Least, Lower, TruncDate
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
@@ -48,7 +50,7 @@ class Word(models.Model):
     # times_correct = REMOVED
     # last_practiced = REMOVED
     word_grouping = models.JSONField(default=list)
-    # Keep for analytics only (global stats)
+    # Keep for analytics only (global stats) - rolled up from WordStatShard
     total_attempts = models.IntegerField(default=0)
     total_correct = models.IntegerField(default=0)
     source = models.CharField(max_length=100, default="Unknown", blank=True)
@@ -59,11 +61,209 @@ class Word(models.Model):
         indexes = [
             models.Index(fields=['group_number']),
             models.Index(fields=['created_at']),
+            # Case-insensitive duplicate checks in the bulk importer
+            models.Index(Lower('word'), name='word_lower_idx'),
         ]
 
     def __str__(self):
         return self.word
 
+class WordNeighbors(models.Model):
+    """Precomputed most-confusable words - feeds hard quiz distractors"""
+    word = models.OneToOneField(Word, on_delete=models.CASCADE,
+                               related_name="neighbors")
+    # [[word_id, score], ...] sorted by similarity, highest first
+    neighbors = models.JSONField(default=list)
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.word_id} -> {len(self.neighbors)} neighbors"
+
+class WordStatShard(models.Model):
+    """Global answer counters for a word, split over shards
+
+    Answers bump one shard row (chosen by user) instead of the Word row, so
+    learners answering the same word don't contend on it. rollup() folds
+    the shards into Word.total_attempts / total_correct periodically.
+    """
+    SHARD_COUNT = 8
+
+    word = models.ForeignKey(Word, on_delete=models.CASCADE,
+                            related_name="stat_shards")
+    shard = models.SmallIntegerField()
+    attempts = models.IntegerField(default=0)
+    correct = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['word', 'shard']
+
+    @classmethod
+    def shard_for(cls, user_id):
+        return user_id % cls.SHARD_COUNT
+
+    @classmethod
+    def record(cls, word_id, user_id, attempts=1, correct=0):
+        """Add answer counts for word_id to the user's shard"""
+        shard = cls.shard_for(user_id)
+        updated = cls.objects.filter(word_id=word_id, shard=shard).update(
+            attempts=F('attempts') + attempts, correct=F('correct') + correct
+        )
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(word_id=word_id, shard=shard,
+                                   attempts=attempts, correct=correct)
+        except IntegrityError:
+            # Created concurrently - fall back to the increment
+            cls.objects.filter(word_id=word_id, shard=shard).update(
+                attempts=F('attempts') + attempts, correct=F('correct') + correct
+            )
+
+    @classmethod
+    def record_many(cls, deltas, user_id):
+        """Add {word_id: (attempts, correct)} with one UPDATE per distinct delta"""
+        shard = cls.shard_for(user_id)
+        existing = set(cls.objects.filter(
+            word_id__in=list(deltas), shard=shard
+        ).values_list('word_id', flat=True))
+
+        by_delta = {}
+        for word_id in existing:
+            by_delta.setdefault(tuple(deltas[word_id]), []).append(word_id)
+        for (attempts, correct), word_ids in by_delta.items():
+            cls.objects.filter(word_id__in=word_ids, shard=shard).update(
+                attempts=F('attempts') + attempts, correct=F('correct') + correct
+            )
+
+        cls.objects.bulk_create([
+            cls(word_id=word_id, shard=shard, attempts=delta[0], correct=delta[1])
+            for word_id, delta in deltas.items() if word_id not in existing
+        ])
+
+    @classmethod
+    def rollup(cls):
+        """Fold shard counts into Word totals - returns words updated
+
+        Shards are decremented by exactly what was read, so answers that
+        land while the rollup runs are kept for the next one.
+        """
+        with transaction.atomic():
+            rows = list(cls.objects.filter(
+                models.Q(attempts__gt=0) | models.Q(correct__gt=0)
+            ).values_list('id', 'word_id', 'attempts', 'correct'))
+
+            totals = {}
+            shards_by_delta = {}
+            for shard_id, word_id, attempts, correct in rows:
+                total = totals.setdefault(word_id, [0, 0])
+                total[0] += attempts
+                total[1] += correct
+                shards_by_delta.setdefault((attempts, correct), []).append(shard_id)
+
+            words_by_delta = {}
+            for word_id, total in totals.items():
+                words_by_delta.setdefault(tuple(total), []).append(word_id)
+            for (attempts, correct), word_ids in words_by_delta.items():
+                Word.objects.filter(id__in=word_ids).update(
+                    total_attempts=F('total_attempts') + attempts,
+                    total_correct=F('total_correct') + correct
+                )
+            for (attempts, correct), shard_ids in shards_by_delta.items():
+                cls.objects.filter(id__in=shard_ids).update(
+                    attempts=F('attempts') - attempts, correct=F('correct') - correct
+                )
+            # Serialized words changed - log them for ?since= delta clients.
+            # Only counters moved, so content_version (ETags, indexes) stays.
+            if totals:
+                CatalogChange.record(updated_ids=list(totals), content=False)
+        return len(totals)
+
+class CatalogVersion(models.Model):
+    """Single-row counters bumped on catalog (Word) changes
+
+    version numbers every change logged for ?since= delta clients, rolled
+    up answer counters included. content_version moves only when what the
+    words say changes; ETags and the in-memory indexes read that one, so
+    counter rollups don't invalidate them.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+    content_version = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def content(cls):
+        return cls.objects.filter(pk=1).values_list('content_version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls, content=True):
+        """Increment the version (and content_version) and return the version
+
+        The UPDATE locks the row until commit, so versions commit in order.
+        """
+        updates = {'version': F('version') + 1}
+        if content:
+            updates['content_version'] = F('content_version') + 1
+        if not cls.objects.filter(pk=1).update(**updates):
+            _, created = cls.objects.get_or_create(
+                pk=1, defaults={'version': 1, 'content_version': int(content)}
+            )
+            if not created:
+                cls.objects.filter(pk=1).update(**updates)
+        return cls.current()
+
+class CatalogChange(models.Model):
+    """Append-only log of Word writes, one row per word per catalog version
+
+    Lets /api/words/?since=<version> return just the words changed or
+    deleted after a version the client already holds.
+    """
+    version = models.PositiveBigIntegerField(db_index=True)
+    word_id = models.IntegerField()  # No FK - entries outlive deleted words
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    # How long deltas stay available; older `since` values get 410 and refetch
+    RETENTION = timedelta(days=30)
+
+    @classmethod
+    def record(cls, updated_ids=(), deleted_ids=(), content=True):
+        """Bump CatalogVersion and log the changed words under it
+
+        content=False logs counter-only changes without moving
+        content_version.
+        """
+        version = CatalogVersion.bump(content=content)
+        cls.objects.bulk_create(
+            [cls(version=version, word_id=word_id) for word_id in updated_ids]
+            + [cls(version=version, word_id=word_id, deleted=True) for word_id in deleted_ids]
+        )
+        return version
+
+    @classmethod
+    def prune(cls, older_than=None):
+        """Drop whole versions logged before the retention window
+
+        Returns rows deleted. oldest_answerable() moves up with the log,
+        so clients behind it get 410 and fetch the full catalog.
+        """
+        cutoff = timezone.now() - (cls.RETENTION if older_than is None else older_than)
+        stale = cls.objects.filter(created_at__lt=cutoff).aggregate(top=Max('version'))['top']
+        if stale is None:
+            return 0
+        # By version, so a version is never left half-logged
+        deleted, _ = cls.objects.filter(version__lte=stale).delete()
+        return deleted
+
+    @classmethod
+    def oldest_answerable(cls):
+        """Lowest `since` the log can answer (changes before it were not logged)"""
+        oldest = cls.objects.aggregate(oldest=Min('version'))['oldest']
+        return oldest - 1 if oldest is not None else CatalogVersion.current()
+
 class UserWordProgress(models.Model):
     """THE SINGLE SOURCE OF TRUTH for all user progress"""
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
@@ -96,6 +296,16 @@ class UserWordProgress(models.Model):
             models.Index(fields=['user', 'mastery']),
             models.Index(fields=['user', 'due_date']),
             models.Index(fields=['user', 'is_learning']),
+            # Partial + covering (word_id included): due reviews and the
+            # low-mastery list are answered from the index alone. SQLite
+            # only treats the index as covering when the filtered column
+            # is itself indexed, hence the trailing marked_for_review.
+            models.Index(fields=['user', 'due_date', 'word', 'marked_for_review'],
+                         condition=Q(marked_for_review=True),
+                         name='uwp_user_review_due_idx'),
+            models.Index(fields=['user', 'mastery', 'word'],
+                         condition=Q(mastery__lte=0),
+                         name='uwp_user_low_mastery_idx'),
         ]
 
     def __str__(self):
@@ -107,26 +317,50 @@ class UserWordProgress(models.Model):
             return 0
         return (self.times_correct / self.times_asked) * 100
 
+    def snapshot(self):
+        """(mastery, due_date, marked_for_review) - input to UserStats deltas"""
+        return (self.mastery, self.due_date, self.marked_for_review)
+
     def is_due_for_review(self):
         """Check if word is due for spaced repetition"""
         if not self.due_date:
             return False
         return timezone.now() >= self.due_date
 
+    # Review interval by mastery band: (highest mastery in band, days)
+    REVIEW_INTERVALS = [
+        (-1, 1),  # Negative - practice daily
+        (2, 2),  # Every 2 days
+        (5, 7),  # Weekly
+        (8, 21),  # Every 3 weeks
+    ]
+    MAX_REVIEW_INTERVAL = 60  # Every 2 months
+
     def calculate_next_due_date(self):
         """Smart spaced repetition based on mastery level"""
-        if self.mastery < 0:
-            return timezone.now() + timedelta(days=1)  # Practice daily
-        elif self.mastery <= 2:
-            return timezone.now() + timedelta(days=2)  # Every 2 days
-        elif self.mastery <= 5:
-            return timezone.now() + timedelta(days=7)  # Weekly
-        elif self.mastery <= 8:
-            return timezone.now() + timedelta(days=21)  # Every 3 weeks
-        else:
-            return timezone.now() + timedelta(days=60)  # Every 2 months
+        for highest, days in self.REVIEW_INTERVALS:
+            if self.mastery <= highest:
+                return timezone.now() + timedelta(days=days)
+        return timezone.now() + timedelta(days=self.MAX_REVIEW_INTERVAL)
+
+    @classmethod
+    def due_date_expression(cls, now=None):
+        """calculate_next_due_date() as SQL, for set-based scheduling"""
+        now = now or timezone.now()
+        return Case(
+            *[When(mastery__lte=highest, then=Value(now + timedelta(days=days)))
+              for highest, days in cls.REVIEW_INTERVALS],
+            default=Value(now + timedelta(days=cls.MAX_REVIEW_INTERVAL)),
+            output_field=models.DateTimeField(),
+        )
+
+    # Fields changed by update_mastery - the minimal write set per answer
+    ANSWER_FIELDS = [
+        'mastery', 'times_asked', 'times_correct', 'consecutive_correct',
+        'due_date', 'marked_for_review', 'is_learning', 'last_practiced',
+    ]
 
-    def update_mastery(self, is_correct):
+    def update_mastery(self, is_correct, save=True):
         """Update mastery with your preferred scoring system"""
         if is_correct:
             self.mastery += 1
@@ -145,7 +379,8 @@ class UserWordProgress(models.Model):
 
         # Mark as learning if struggling
         self.is_learning = self.mastery < 6
-        self.save()
+        if save:
+            self.save(update_fields=self.ANSWER_FIELDS if self.pk else None)
 
 class GroupProgress(models.Model):
     """Track user completion of word groups"""
@@ -174,14 +409,81 @@ class GroupProgress(models.Model):
             models.Index(fields=['user', 'group_number']),
         ]
 
+    @classmethod
+    def record_changes(cls, user_id, group_number, changes):
+        """Apply [(mastery_before, mastery_after), ...] for words of one group
+
+        mastery_before is None for newly created progress, mastery_after
+        None for deleted progress. Counters move only when a word is
+        started, removed or crosses mastery_threshold; the first touch of a
+        group creates its row with a full recount.
+        """
+        changes = [(before, after) for before, after in changes if before != after]
+        if not changes:
+            return None
+
+        group = cls.objects.filter(user_id=user_id, group_number=group_number).first()
+        if group is None:
+            group, created = cls.objects.get_or_create(
+                user_id=user_id, group_number=group_number,
+                defaults={'mastery_threshold': 3}
+            )
+            if created:
+                group.check_and_update_completion()
+                return group
+
+        threshold = group.mastery_threshold
+        started = sum(int(before is None) - int(after is None) for before, after in changes)
+        mastered = sum(
+            int(after is not None and after >= threshold)
+            - int(before is not None and before >= threshold)
+            for before, after in changes
+        )
+        if not started and not mastered:
+            return group
+
+        group.words_started += started
+        group.words_mastered += mastered
+        if (not group.is_completed and group.words_total > 0
+                and group.words_mastered >= group.words_total):
+            # Confirm against live counts before scheduling reviews
+            group.check_and_update_completion()
+            return group
+
+        cls.objects.filter(pk=group.pk).update(
+            words_started=F('words_started') + started,
+            words_mastered=F('words_mastered') + mastered,
+            last_activity=timezone.now(),
+        )
+        return group
+
+    @classmethod
+    def refresh_totals(cls, group_numbers):
+        """Recount words_total on every user's row for these groups"""
+        group_numbers = set(group_numbers)
+        if not group_numbers:
+            return
+        # One correlated UPDATE however many groups a bulk write touched
+        totals = Word.objects.filter(
+            group_number=OuterRef('group_number')
+        ).order_by().values('group_number').annotate(total=Count('id')).values('total')
+        cls.objects.filter(group_number__in=group_numbers).update(
+            words_total=Coalesce(Subquery(totals), 0)
+        )
+
     def check_and_update_completion(self):
-        """Check if all words in group meet mastery threshold"""
+        """Recount the group from scratch and mark it complete if mastered
+
+        Write-side only - answers keep the counters current via
+        record_changes(); this is the full recount used on session
+        completion and by the nightly reconcile.
+        """
         group_words = Word.objects.filter(group_number=self.group_number)
         self.words_total = group_words.count()
 
         progress_records = UserWordProgress.objects.filter(
-            user=self.user,
-            word__in=group_words
+            user_id=self.user_id,
+            word__group_number=self.group_number
         )
 
         self.words_started = progress_records.count()
@@ -197,12 +499,16 @@ class GroupProgress(models.Model):
             self.is_completed = True
             self.completed_at = timezone.now()
 
-            # Schedule all words for spaced repetition
-            for progress in progress_records:
-                if progress.mastery >= self.mastery_threshold:
-                    progress.due_date = progress.calculate_next_due_date()
-                    progress.marked_for_review = True
-                    progress.save()
+            # Schedule all mastered words for spaced repetition in one UPDATE
+            progress_records.filter(mastery__gte=self.mastery_threshold).update(
+                due_date=UserWordProgress.due_date_expression(),
+                marked_for_review=True,
+            )
+
+            # Newly scheduled reviews change the user's due counters
+            stats = UserStats.objects.filter(user_id=self.user_id).first()
+            if stats:
+                stats.refresh_due()
 
         self.save()
         return is_now_complete
@@ -239,6 +545,10 @@ class QuizSession(models.Model):
     retry_queue = models.JSONField(default=list)  # [word_id, word_id, ...]
     retry_requirements = models.JSONField(default=dict)  # {word_id: consecutive_needed}
 
+    # QUESTION PLAN - priority-ordered word IDs materialized at session start
+    question_plan = models.JSONField(null=True, blank=True)  # None = not built yet
+    plan_cursor = models.IntegerField(default=0)  # Index of next planned word
+
     # RESULTS
     words_mastered_this_session = models.IntegerField(default=0)
     group_completed = models.BooleanField(default=False)
@@ -255,16 +565,30 @@ class QuizSession(models.Model):
             return 0
         return (self.correct_answers / self.total_questions) * 100
 
-    def add_to_retry_queue(self, word_id, required_consecutive=2):
+    def next_planned_word_id(self):
+        """Word ID at the plan cursor, or None when the plan is exhausted"""
+        if self.question_plan and self.plan_cursor < len(self.question_plan):
+            return self.question_plan[self.plan_cursor]
+        return None
+
+    def advance_plan(self, word_id):
+        """Move the cursor past word_id if it is the next planned word"""
+        if word_id is not None and self.next_planned_word_id() == word_id:
+            self.plan_cursor += 1
+            return True
+        return False
+
+    def add_to_retry_queue(self, word_id, required_consecutive=2, save=True):
         """Add word to retry queue - needs consecutive correct answers"""
         if word_id not in self.retry_queue:
             self.retry_queue.append(word_id)
         
         # Set requirement for consecutive correct answers
         self.retry_requirements[str(word_id)] = required_consecutive
-        self.save()
+        if save:
+            self.save()
 
-    def check_retry_completion(self, word_id, consecutive_correct):
+    def check_retry_completion(self, word_id, consecutive_correct, save=True):
         """Check if word can be removed from retry queue"""
         required = self.retry_requirements.get(str(word_id), 2)
         
@@ -273,7 +597,8 @@ class QuizSession(models.Model):
                 self.retry_queue.remove(word_id)
             if str(word_id) in self.retry_requirements:
                 del self.retry_requirements[str(word_id)]
-            self.save()
+            if save:
+                self.save()
             return True
         return False
 
@@ -307,6 +632,8 @@ class QuizAttempt(models.Model):
         indexes = [
             models.Index(fields=['session', 'timestamp']),
             models.Index(fields=['word', 'is_correct']),
+            # Covers the asked-words lookup (session -> word_id)
+            models.Index(fields=['session', 'word'], name='attempt_session_word_idx'),
         ]
 
 # Keep existing models for compatibility
@@ -345,7 +672,262 @@ class UserStreak(models.Model):
         self.longest_streak = max(self.longest_streak, self.current_streak)
         self.last_quiz_date = today
         self.total_quizzes += 1
-        self.save()
+        self.save(update_fields=[
+            'current_streak', 'longest_streak', 'last_quiz_date', 'total_quizzes'
+        ] if self.pk else None)
+
+def mastery_bucket(mastery):
+    """Dashboard mastery band for a mastery value"""
+    if mastery < 0:
+        return 'struggling'
+    if mastery <= 2:
+        return 'learning'
+    if mastery <= 5:
+        return 'practicing'
+    return 'mastered'
+
+class UserStats(models.Model):
+    """Per-user dashboard counters - one row read instead of aggregates
+
+    Kept current by the answer and mark-read paths through
+    record_progress_changes() and record_session(); reconcile() recomputes
+    everything from scratch (nightly job, or on a user's first write).
+    """
+    RECENT_DAYS = 7
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                               related_name="stats")
+
+    # MASTERY DISTRIBUTION
+    struggling = models.IntegerField(default=0)  # mastery < 0
+    learning = models.IntegerField(default=0)  # 0-2
+    practicing = models.IntegerField(default=0)  # 3-5
+    mastered = models.IntegerField(default=0)  # 6+
+    total_studied = models.IntegerField(default=0)
+    low_mastery_count = models.IntegerField(default=0)  # mastery <= 0
+
+    # DUE REVIEWS - due_count goes stale once next_due_at passes
+    due_count = models.IntegerField(default=0)
+    next_due_at = models.DateTimeField(null=True, blank=True)
+
+    # RECENT PERFORMANCE - {"YYYY-MM-DD": [sessions, questions, correct,
+    #                       words_mastered, accuracy_sum, accuracy_sessions]}
+    daily_totals = models.JSONField(default=dict)
+
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    # Bumped with every change to the user's progress, sessions or groups;
+    # read endpoints derive their ETags from it
+    progress_version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} stats"
+
+    @classmethod
+    def for_user(cls, user):
+        """Current stats for user - read-only, nothing is saved here
+
+        Users without a row yet get counters computed on the fly; a row
+        whose next_due_at has passed gets its due count recounted.
+        """
+        stats = cls.objects.filter(user=user).first()
+        if stats is None:
+            stats = cls(user=user)
+            stats.reconcile(save=False)
+        elif stats.next_due_at and timezone.now() >= stats.next_due_at:
+            stats.refresh_due(save=False)
+        return stats
+
+    @classmethod
+    def reconcile_user(cls, user_id):
+        """Recount user_id's row, creating it if needed"""
+        stats = cls.objects.filter(user_id=user_id).first()
+        if stats is None:
+            cls._create(user_id)
+        else:
+            stats.reconcile()
+
+    @classmethod
+    def bump_version(cls, user_id):
+        """Record a change that touches no counter (e.g. a new session)
+
+        Counter updates bump the version in the same statement, and
+        GroupProgress only changes alongside them.
+        """
+        cls._update_or_create(user_id, progress_version=F('progress_version') + 1)
+
+    @classmethod
+    def _update_or_create(cls, user_id, **updates):
+        if not cls.objects.filter(user_id=user_id).update(**updates):
+            # First write for this user - the recount already includes it
+            if not cls._create(user_id):
+                cls.objects.filter(user_id=user_id).update(**updates)
+
+    @classmethod
+    def _create(cls, user_id):
+        """Create the row from scratch; False if another request beat us"""
+        try:
+            with transaction.atomic():
+                cls(user_id=user_id).reconcile()
+            return True
+        except IntegrityError:
+            return False
+
+    @staticmethod
+    def _is_due(state, now):
+        return bool(state and state[2] and state[1] and state[1] <= now)
+
+    @classmethod
+    def record_progress_changes(cls, user_id, changes, now=None):
+        """Apply [(before, after), ...] progress snapshots in one UPDATE
+
+        before is None for a newly created progress row. The user's first
+        write creates the row by reconciling instead.
+        """
+        now = now or timezone.now()
+        deltas = {}
+        next_due = None
+
+        def bump(field, amount):
+            deltas[field] = deltas.get(field, 0) + amount
+
+        for before, after in changes:
+            if before is None:
+                bump('total_studied', 1)
+            else:
+                bump(mastery_bucket(before[0]), -1)
+                bump('low_mastery_count', -int(before[0] <= 0))
+            bump(mastery_bucket(after[0]), 1)
+            bump('low_mastery_count', int(after[0] <= 0))
+            bump('due_count', int(cls._is_due(after, now)) - int(cls._is_due(before, now)))
+
+            if after[1] and after[1] > now:
+                next_due = min(next_due, after[1]) if next_due else after[1]
+
+        updates = {
+            field: F(field) + amount for field, amount in deltas.items() if amount
+        }
+        if next_due:
+            updates['next_due_at'] = Least(Coalesce('next_due_at', Value(next_due)), Value(next_due))
+        updates['progress_version'] = F('progress_version') + 1
+        cls._update_or_create(user_id, **updates)
+
+    @classmethod
+    def record_session(cls, session):
+        """Add a completed session to its day's recent-performance bucket"""
+        with transaction.atomic():
+            stats = cls.objects.select_for_update().filter(user_id=session.user_id).first()
+            if stats is None:
+                return
+            day = timezone.localdate(session.started_at).isoformat()
+            totals = stats.daily_totals.get(day, [0, 0, 0, 0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += session.total_questions
+            totals[2] += session.correct_answers
+            totals[3] += session.words_mastered_this_session
+            if session.total_questions:
+                totals[4] += session.accuracy_rate
+                totals[5] += 1
+            stats.daily_totals[day] = totals
+            stats.daily_totals = stats._recent_days(stats.daily_totals)
+            stats.progress_version = F('progress_version') + 1
+            fields = ['daily_totals', 'progress_version']
+            if stats.next_due_at and timezone.now() >= stats.next_due_at:
+                stats.refresh_due(save=False)
+                fields += ['due_count', 'next_due_at']
+            stats.save(update_fields=fields)
+
+    def _recent_days(self, daily_totals):
+        cutoff = (timezone.localdate() - timedelta(days=self.RECENT_DAYS - 1)).isoformat()
+        return {day: totals for day, totals in daily_totals.items() if day >= cutoff}
+
+    def recent_performance(self):
+        """Same shape as the old completed-sessions aggregate"""
+        days = self._recent_days(self.daily_totals).values()
+        sessions = sum(t[0] for t in days)
+        accuracy_sessions = sum(t[5] for t in days)
+        return {
+            'sessions_count': sessions,
+            'total_questions': sum(t[1] for t in days) if sessions else None,
+            'total_correct': sum(t[2] for t in days) if sessions else None,
+            'words_mastered': sum(t[3] for t in days) if sessions else None,
+            'avg_accuracy': (
+                sum(t[4] for t in days) / accuracy_sessions if accuracy_sessions else None
+            ),
+        }
+
+    def mastery_distribution(self):
+        return {
+            'struggling': self.struggling,
+            'learning': self.learning,
+            'practicing': self.practicing,
+            'mastered': self.mastered,
+            'total_studied': self.total_studied,
+        }
+
+    def refresh_due(self, save=True):
+        """Recount due reviews and find the next time the count changes"""
+        now = timezone.now()
+        progress = UserWordProgress.objects.filter(user_id=self.user_id)
+        self.due_count = progress.filter(due_date__lte=now, marked_for_review=True).count()
+        self.next_due_at = progress.filter(due_date__gt=now).aggregate(
+            next_due=Min('due_date')
+        )['next_due']
+        if save and self.pk:
+            self.progress_version = F('progress_version') + 1
+            self.save(update_fields=['due_count', 'next_due_at', 'progress_version'])
+
+    def reconcile(self, save=True):
+        """Recompute every counter from the source tables"""
+        counts = UserWordProgress.objects.filter(user_id=self.user_id).aggregate(
+            struggling=Count('id', filter=Q(mastery__lt=0)),
+            learning=Count('id', filter=Q(mastery__range=(0, 2))),
+            practicing=Count('id', filter=Q(mastery__range=(3, 5))),
+            mastered=Count('id', filter=Q(mastery__gte=6)),
+            total_studied=Count('id'),
+            low_mastery_count=Count('id', filter=Q(mastery__lte=0)),
+        )
+        for field, value in counts.items():
+            setattr(self, field, value)
+
+        cutoff = timezone.now() - timedelta(days=self.RECENT_DAYS)
+        daily = (
+            QuizSession.objects
+            .filter(user_id=self.user_id, started_at__gte=cutoff, completed_at__isnull=False)
+            .annotate(day=TruncDate('started_at'))
+            .values('day')
+            .annotate(
+                sessions=Count('id'),
+                questions=Sum('total_questions'),
+                correct=Sum('correct_answers'),
+                mastered=Sum('words_mastered_this_session'),
+            )
+        )
+        accuracy = {}
+        for day, total, correct in (
+            QuizSession.objects
+            .filter(user_id=self.user_id, started_at__gte=cutoff,
+                    completed_at__isnull=False, total_questions__gt=0)
+            .annotate(day=TruncDate('started_at'))
+            .values_list('day', 'total_questions', 'correct_answers')
+        ):
+            day_accuracy = accuracy.setdefault(day, [0.0, 0])
+            day_accuracy[0] += correct / total * 100
+            day_accuracy[1] += 1
+        self.daily_totals = self._recent_days({
+            row['day'].isoformat(): [
+                row['sessions'], row['questions'], row['correct'], row['mastered'],
+                *accuracy.get(row['day'], [0.0, 0])
+            ]
+            for row in daily
+        })
+
+        self.refresh_due(save=False)
+        self.reconciled_at = timezone.now()
+        if save:
+            # Any correction must invalidate cached responses
+            self.progress_version += 1
+            self.save()
 
 # Keep existing models for backward compatibility during transition
 class MathQuestion(models.Model):
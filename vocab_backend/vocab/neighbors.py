@@ -0,0 +1,245 @@
+# ============================================================================
+# NEIGHBOR INDEX - Most confusable words for hard quiz distractors
+# ============================================================================
+#
+# Offline build: every word becomes a TF-IDF vector over its meaning,
+# category, tags, word_grouping and synonyms. Cosine similarity is computed
+# through an inverted index and the top NEIGHBOR_K matches per word are
+# stored in WordNeighbors. Near-synonyms (same meaning, or listed in each
+# other's synonyms) are left out - as an option they would be a second
+# right answer. The question endpoint only reads the in-memory copy loaded
+# by NeighborIndex.
+
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Word, WordNeighbors
+
+NEIGHBOR_K = 10
+
+# Terms in more than this share of the catalog carry no signal
+MAX_DOCUMENT_FREQUENCY = 0.25
+
+TOKEN_RE = re.compile(r"[a-z]+")
+
+STOPWORDS = frozenset("""
+    a an and are as at be been being but by for from has have in into is it its
+    of on or so such that the their them there these they this to was were which
+    who whom with without something someone somebody one ones very not no
+""".split())
+
+# Below this cosine similarity a "neighbor" is just noise
+MIN_SIMILARITY = 0.05
+
+# Field weights - shared tags/groupings say more than a shared meaning word
+CATEGORY_WEIGHT = 0.5
+TAG_WEIGHT = 1.5
+GROUPING_WEIGHT = 2.0
+SYNONYM_WEIGHT = 1.0
+
+# Meanings sharing this share of their terms (Jaccard) say the same thing
+SAME_MEANING_OVERLAP = 0.6
+
+
+def _tokens(text):
+    return [
+        t for t in TOKEN_RE.findall(str(text).lower())
+        if len(t) > 2 and t not in STOPWORDS
+    ]
+
+def _labels(value):
+    """Flatten a JSON list field into lowercase string labels"""
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    return [str(v).strip().lower() for v in value if str(v).strip()]
+
+def word_terms(meaning, category, tags, word_grouping, synonyms):
+    """Weighted term counts for one word"""
+    terms = Counter()
+    for token in _tokens(meaning):
+        terms[token] += 1.0
+    for synonym in _labels(synonyms):
+        for token in _tokens(synonym):
+            terms[token] += SYNONYM_WEIGHT
+    if category:
+        terms[f"cat:{category.lower()}"] += CATEGORY_WEIGHT
+    for tag in _labels(tags):
+        terms[f"tag:{tag}"] += TAG_WEIGHT
+    for group in _labels(word_grouping):
+        terms[f"grp:{group}"] += GROUPING_WEIGHT
+    return terms
+
+def answer_key(word, meaning, synonyms):
+    """(meaning terms, word, synonyms) used to spot near-synonyms"""
+    terms = frozenset(_tokens(meaning)) or frozenset([str(meaning).strip().lower()])
+    return terms, word.strip().lower(), frozenset(_labels(synonyms))
+
+def same_answer(a, b):
+    """Whether two answer keys are (near-)synonyms of each other"""
+    if a[1] in b[2] or b[1] in a[2]:
+        return True
+    return len(a[0] & b[0]) / len(a[0] | b[0]) >= SAME_MEANING_OVERLAP
+
+def load_corpus():
+    """({word_id: term Counter}, {word_id: answer key}) for the whole catalog"""
+    rows = Word.objects.order_by().values_list(
+        'id', 'word', 'meaning', 'category', 'tags', 'word_grouping', 'synonyms'
+    )
+    corpus, answers = {}, {}
+    for word_id, word, meaning, category, tags, grouping, synonyms in rows.iterator(chunk_size=2000):
+        corpus[word_id] = word_terms(meaning, category, tags, grouping, synonyms)
+        answers[word_id] = answer_key(word, meaning, synonyms)
+    return corpus, answers
+
+def vectorize(corpus):
+    """L2-normalized TF-IDF vectors plus the inverted index over them"""
+    n_docs = len(corpus)
+    df = Counter()
+    for terms in corpus.values():
+        df.update(terms.keys())
+
+    max_df = max(10, int(n_docs * MAX_DOCUMENT_FREQUENCY))
+    idf = {
+        term: math.log((1 + n_docs) / (1 + count)) + 1
+        for term, count in df.items()
+        if 1 < count <= max_df  # Unique terms can't link two words
+    }
+
+    vectors = {}
+    postings = defaultdict(list)
+    for word_id, terms in corpus.items():
+        vec = {t: (1 + math.log(tf)) * idf[t] for t, tf in terms.items() if t in idf}
+        norm = math.sqrt(sum(w * w for w in vec.values()))
+        if not norm:
+            vectors[word_id] = {}
+            continue
+        vec = {t: w / norm for t, w in vec.items()}
+        vectors[word_id] = vec
+        for term, weight in vec.items():
+            postings[term].append((word_id, weight))
+    return vectors, postings
+
+def top_neighbors(word_id, vectors, postings, k=NEIGHBOR_K, answers=None):
+    """[[neighbor_id, score], ...] for one word, best first
+
+    With answers ({word_id: answer_key}), near-synonyms are skipped.
+    """
+    scores = defaultdict(float)
+    for term, weight in vectors.get(word_id, {}).items():
+        for other_id, other_weight in postings[term]:
+            if other_id != word_id:
+                scores[other_id] += weight * other_weight
+    ranked = [
+        item for item in scores.items()
+        if item[1] >= MIN_SIMILARITY
+        and not (answers and same_answer(answers[word_id], answers[item[0]]))
+    ]
+    best = sorted(ranked, key=lambda item: (-item[1], item[0]))[:k]
+    return [[other_id, round(score, 4)] for other_id, score in best]
+
+def _merge(neighbors, other_id, score, k=NEIGHBOR_K):
+    """Insert (other_id, score) into a sorted neighbor list if it ranks"""
+    merged = [pair for pair in neighbors if pair[0] != other_id]
+    merged.append([other_id, score])
+    merged.sort(key=lambda pair: (-pair[1], pair[0]))
+    merged = merged[:k]
+    return merged if merged != neighbors else None
+
+def build_neighbor_index(full=False, k=NEIGHBOR_K, batch_size=500):
+    """Rebuild stored neighbors - returns (words_built, words_updated)
+
+    Incremental mode (default) only computes neighbors for words without a
+    WordNeighbors row, e.g. words added through add_words_bulk, and merges
+    them into the stored lists of existing words. IDF weights drift as the
+    catalog grows, so run a full rebuild now and then.
+    """
+    corpus, answers = load_corpus()
+    vectors, postings = vectorize(corpus)
+
+    existing = {} if full else dict(
+        WordNeighbors.objects.values_list('word_id', 'neighbors')
+    )
+    new_ids = [word_id for word_id in corpus if word_id not in existing]
+
+    built = {
+        word_id: top_neighbors(word_id, vectors, postings, k, answers)
+        for word_id in new_ids
+    }
+
+    # Similarity is symmetric - new words may now rank for existing ones
+    changed = {}
+    for new_id, neighbors in built.items():
+        for other_id, score in neighbors:
+            if other_id not in existing:
+                continue
+            current = changed.get(other_id, existing[other_id])
+            merged = _merge(current, new_id, score, k)
+            if merged is not None:
+                changed[other_id] = merged
+
+    with transaction.atomic():
+        if full:
+            WordNeighbors.objects.all().delete()
+        WordNeighbors.objects.bulk_create(
+            [WordNeighbors(word_id=word_id, neighbors=neighbors)
+             for word_id, neighbors in built.items()],
+            batch_size=batch_size,
+        )
+        if changed:
+            now = timezone.now()
+            rows = list(WordNeighbors.objects.filter(word_id__in=list(changed)))
+            for row in rows:
+                row.neighbors = changed[row.word_id]
+                row.built_at = now
+            WordNeighbors.objects.bulk_update(rows, ['neighbors', 'built_at'],
+                                              batch_size=batch_size)
+
+    neighbor_index.invalidate()
+    return len(built), len(changed)
+
+
+class NeighborIndex:
+    """In-memory copy of WordNeighbors: word_id -> tuple of neighbor IDs"""
+
+    # Pick up rebuilds made by the management command in another process
+    RELOAD_SECONDS = 300
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._neighbors = None
+        self._loaded_at = 0.0
+
+    def invalidate(self):
+        with self._lock:
+            self._neighbors = None
+
+    def _ensure_loaded(self):
+        neighbors = self._neighbors
+        if neighbors is not None and time.monotonic() - self._loaded_at < self.RELOAD_SECONDS:
+            return neighbors
+        with self._lock:
+            if (self._neighbors is not None
+                    and time.monotonic() - self._loaded_at < self.RELOAD_SECONDS):
+                return self._neighbors
+            rows = WordNeighbors.objects.values_list('word_id', 'neighbors')
+            self._neighbors = {
+                word_id: tuple(pair[0] for pair in pairs)
+                for word_id, pairs in rows.iterator(chunk_size=2000)
+            }
+            self._loaded_at = time.monotonic()
+            return self._neighbors
+
+    def get(self, word_id):
+        """Neighbor IDs for word_id, most confusable first"""
+        return self._ensure_loaded().get(word_id, ())
+
+
+neighbor_index = NeighborIndex()
@@ -0,0 +1,132 @@
+# ============================================================================
+# RENDERERS - Faster JSON and MessagePack for the DRF API
+# ============================================================================
+#
+# FastJSONRenderer produces the same JSON as DRF's JSONRenderer, but encodes
+# with orjson when it is installed (several times faster on word lists with
+# nested examples/links). MessagePackRenderer answers
+# "Accept: application/msgpack" with msgpack when installed, or the small
+# pure-Python packer below. Compression is GZipMiddleware's job.
+
+import struct
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional - stdlib json via JSONRenderer
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional - pure-Python packb below
+    msgpack = None
+
+# Anything neither encoder knows natively (Decimal, UUID, QuerySet, ...)
+# goes through DRF's conversions, so every format agrees on the values
+_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is available"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Indented output (browsable API, ?indent=) stays on the stdlib path
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            # Datetimes go through DRF's formatting ("Z" suffix) as before
+            ret = orjson.dumps(
+                data, default=_default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers past 64 bits - the stdlib encoder copes
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same JavaScript-safe escaping as JSONRenderer
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """application/msgpack - compact binary with the same structure as JSON"""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if msgpack is not None:
+            return msgpack.packb(data, default=_default, use_bin_type=True)
+        return packb(data)
+
+
+def packb(obj):
+    """Serialize obj to MessagePack bytes (pure Python)"""
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+def _pack_header(out, size, fix_base, fix_max, codes):
+    # codes: (8-bit, 16-bit, 32-bit) type bytes; None where the type has none
+    if size <= fix_max:
+        out.append(fix_base | size)
+    elif codes[0] is not None and size < 0x100:
+        out += struct.pack('>BB', codes[0], size)
+    elif size < 0x10000:
+        out += struct.pack('>BH', codes[1], size)
+    else:
+        out += struct.pack('>BI', codes[2], size)
+
+def _pack(obj, out):
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, int):
+        if 0 <= obj < 0x80:
+            out.append(obj)
+        elif -0x20 <= obj < 0:
+            out.append(obj & 0xff)
+        elif obj >= 0:
+            for code, fmt, top in ((0xcc, '>BB', 0xff), (0xcd, '>BH', 0xffff),
+                                   (0xce, '>BI', 0xffffffff), (0xcf, '>BQ', 0xffffffffffffffff)):
+                if obj <= top:
+                    out += struct.pack(fmt, code, obj)
+                    return
+            raise OverflowError('Integer too large for MessagePack')
+        else:
+            for code, fmt, bottom in ((0xd0, '>Bb', -0x80), (0xd1, '>Bh', -0x8000),
+                                      (0xd2, '>Bi', -0x80000000), (0xd3, '>Bq', -0x8000000000000000)):
+                if obj >= bottom:
+                    out += struct.pack(fmt, code, obj)
+                    return
+            raise OverflowError('Integer too small for MessagePack')
+    elif isinstance(obj, float):
+        out += struct.pack('>Bd', 0xcb, obj)
+    elif isinstance(obj, str):
+        encoded = obj.encode('utf-8')
+        _pack_header(out, len(encoded), 0xa0, 31, (0xd9, 0xda, 0xdb))
+        out += encoded
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        encoded = bytes(obj)
+        _pack_header(out, len(encoded), 0, -1, (0xc4, 0xc5, 0xc6))
+        out += encoded
+    elif isinstance(obj, (list, tuple)):
+        _pack_header(out, len(obj), 0x90, 15, (None, 0xdc, 0xdd))
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        _pack_header(out, len(obj), 0x80, 15, (None, 0xde, 0xdf))
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        _pack(_default(obj), out)
@@ -0,0 +1,240 @@
+# ============================================================================
+# SEARCH - Full-text search over the word catalog
+# ============================================================================
+#
+# On SQLite the catalog is mirrored into an FTS5 virtual table (rowid =
+# Word.id) that notify_catalog_change keeps current. Searches rank with
+# bm25, highlight matches and LEFT JOIN the user's mastery in one query.
+# Other databases, or SQLite builds without FTS5, fall back to an icontains
+# scan (example sentences included) ranked by where the match was found.
+
+import html
+import json
+import re
+
+from django.db import connection
+from django.db.models import Case, When, Value, IntegerField, Q, FilteredRelation, F
+
+from .models import Word
+
+FTS_TABLE = 'vocab_word_fts'
+
+# Indexed columns, in FTS column order
+FTS_COLUMNS = ['word', 'meaning', 'etymology', 'story_mnemonic', 'examples']
+
+# bm25 weights per column - a hit on the word itself matters most
+FTS_WEIGHTS = (10.0, 4.0, 1.0, 1.0, 1.0)
+
+SNIPPET_TOKENS = 12
+BATCH_SIZE = 500
+
+# Highlight markers; swapped for <mark> after HTML-escaping the text
+MARK_OPEN, MARK_CLOSE = '\x02', '\x03'
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# (alias, database name) -> whether the FTS5 table exists
+_enabled = {}
+
+def fts_enabled(using=connection):
+    """True when the FTS5 table exists (created by migration 0022)"""
+    if using.vendor != 'sqlite':
+        return False
+    key = (using.alias, using.settings_dict['NAME'])
+    if key not in _enabled:
+        _enabled[key] = FTS_TABLE in using.introspection.table_names()
+    return _enabled[key]
+
+def _example_text(examples):
+    if not isinstance(examples, list):
+        return ''
+    return '\n'.join(
+        item['text'] for item in examples
+        if isinstance(item, dict) and isinstance(item.get('text'), str)
+    )
+
+def _documents(words):
+    for row in words.values_list('id', *FTS_COLUMNS).iterator(chunk_size=BATCH_SIZE):
+        yield (*row[:-1], _example_text(row[-1]))
+
+def _write(cursor, documents):
+    batch = []
+    for document in documents:
+        batch.append(document)
+        if len(batch) >= BATCH_SIZE:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+                f"VALUES (%s, %s, %s, %s, %s, %s)", batch
+            )
+            batch = []
+    if batch:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+            f"VALUES (%s, %s, %s, %s, %s, %s)", batch
+        )
+
+def _delete(cursor, word_ids):
+    word_ids = list(word_ids)
+    for start in range(0, len(word_ids), BATCH_SIZE):
+        chunk = word_ids[start:start + BATCH_SIZE]
+        cursor.execute(
+            f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(chunk))})",
+            chunk
+        )
+
+def update_index(updated_ids=(), deleted_ids=()):
+    """Re-index changed words and drop deleted ones (no-op without FTS5)"""
+    if not (updated_ids or deleted_ids) or not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        _delete(cursor, [*updated_ids, *deleted_ids])
+        if updated_ids:
+            _write(cursor, _documents(Word.objects.filter(id__in=list(updated_ids))))
+
+def rebuild_index():
+    """Re-index the whole catalog - returns the number of words indexed"""
+    if not fts_enabled():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        _write(cursor, _documents(Word.objects.order_by('id')))
+        cursor.execute(f"SELECT count(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+def match_expression(query):
+    """Safe FTS5 MATCH string: every term required, last one as a prefix"""
+    terms = TOKEN_RE.findall(query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'  # Still typing the last word
+    return ' '.join(quoted)
+
+def render_highlight(text):
+    """HTML-escape text, then turn the match markers into <mark> tags"""
+    return (html.escape(text or '')
+            .replace(MARK_OPEN, '<mark>').replace(MARK_CLOSE, '</mark>'))
+
+def search_words(user, query, limit=20):
+    """Ranked matches for query with the user's mastery - list of dicts"""
+    if fts_enabled():
+        return _search_fts(user, query, limit), 'fts5'
+    return _search_like(user, query, limit), 'like'
+
+def _search_fts(user, query, limit):
+    match = match_expression(query)
+    if match is None:
+        return []
+    weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+    sql = f"""
+        SELECT w.id, w.word, w.meaning, w.group_number,
+               highlight({FTS_TABLE}, 0, %s, %s),
+               snippet({FTS_TABLE}, -1, %s, %s, '…', {SNIPPET_TOKENS}),
+               bm25({FTS_TABLE}, {weights}) AS score,
+               p.mastery
+        FROM {FTS_TABLE}
+        JOIN vocab_word w ON w.id = {FTS_TABLE}.rowid
+        LEFT JOIN vocab_userwordprogress p ON p.word_id = w.id AND p.user_id = %s
+        WHERE {FTS_TABLE} MATCH %s
+        ORDER BY score
+        LIMIT %s
+    """
+    params = [MARK_OPEN, MARK_CLOSE, MARK_OPEN, MARK_CLOSE, user.pk, match, limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [
+        {
+            'id': word_id,
+            'word': word,
+            'meaning': meaning,
+            'group_number': group_number,
+            'highlight': {
+                'word': render_highlight(word_hl),
+                'snippet': render_highlight(snippet),
+            },
+            # bm25 is lower-is-better; flip it so higher means more relevant
+            'score': round(-score, 4),
+            'mastery': mastery if mastery is not None else 0,
+            'studied': mastery is not None,
+        }
+        for word_id, word, meaning, group_number, word_hl, snippet, score, mastery in rows
+    ]
+
+def _mark(text, terms):
+    """Wrap case-insensitive occurrences of terms in the match markers"""
+    if not text or not terms:
+        return text or ''
+    pattern = re.compile('|'.join(re.escape(t) for t in terms), re.IGNORECASE)
+    return pattern.sub(lambda m: f"{MARK_OPEN}{m.group(0)}{MARK_CLOSE}", text)
+
+def _json_escaped(term):
+    """term as it appears inside JSON stored with ensure_ascii (SQLite)"""
+    return json.dumps(term)[1:-1]
+
+def _contains(text, terms):
+    """True when any of terms occurs in text, ignoring case"""
+    lowered = (text or '').lower()
+    return any(term.lower() in lowered for term in terms)
+
+def _search_like(user, query, limit):
+    terms = TOKEN_RE.findall(query)
+    if not terms:
+        return []
+
+    words = Word.objects.all()
+    for term in terms:
+        # examples is JSON text here, so this only narrows the scan - keys
+        # like "text" match too; hits are re-checked on the sentences below
+        in_examples = Q(examples__icontains=term)
+        if _json_escaped(term) != term:
+            in_examples |= Q(examples__icontains=_json_escaped(term))
+        words = words.filter(
+            Q(word__icontains=term) | Q(meaning__icontains=term)
+            | Q(etymology__icontains=term) | Q(story_mnemonic__icontains=term)
+            | in_examples
+        )
+    head = terms[0]
+    rows = words.annotate(
+        progress=FilteredRelation('user_progress', condition=Q(user_progress__user=user)),
+        rank=Case(
+            When(word__iexact=head, then=Value(0)),
+            When(word__istartswith=head, then=Value(1)),
+            When(word__icontains=head, then=Value(2)),
+            default=Value(3),
+            output_field=IntegerField(),
+        ),
+    ).order_by('rank', 'word').values(
+        'id', 'word', 'meaning', 'group_number', 'rank', 'etymology',
+        'story_mnemonic', 'examples', mastery=F('progress__mastery')
+    )
+
+    results = []
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        if len(results) >= limit:
+            break
+        examples = _example_text(row['examples'])
+        fields = [row['word'], row['meaning'], row['etymology'], row['story_mnemonic'], examples]
+        if not all(any(_contains(field, [term]) for field in fields) for term in terms):
+            continue
+        snippet = row['meaning']
+        if not _contains(snippet, terms):
+            # Show the example sentence that matched instead of the meaning
+            snippet = next(
+                (line for line in examples.split('\n') if _contains(line, terms)), snippet
+            )
+        results.append({
+            'id': row['id'],
+            'word': row['word'],
+            'meaning': row['meaning'],
+            'group_number': row['group_number'],
+            'highlight': {
+                'word': render_highlight(_mark(row['word'], terms)),
+                'snippet': render_highlight(_mark(snippet, terms)),
+            },
+            'score': float(3 - row['rank']),
+            'mastery': row['mastery'] if row['mastery'] is not None else 0,
+            'studied': row['mastery'] is not None,
+        })
+    return results
@@ -9,7 +9,17 @@ from .models import (
     QuizSession, QuizAttempt, UserStreak, GroupProgress
 )
 
-class WordSerializer(serializers.ModelSerializer):
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """ModelSerializer taking a `fields` kwarg to output only those fields"""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+class WordSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = Word
         fields = '__all__'
@@ -40,6 +50,14 @@ class WordSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("External links must be an object.")
         return value
 
+class WordImportSerializer(WordSerializer):
+    """WordSerializer without the per-row uniqueness query
+
+    The bulk importer checks duplicates for the whole batch in one lookup.
+    """
+    class Meta(WordSerializer.Meta):
+        extra_kwargs = {'word': {'validators': []}}
+
 class UserWordProgressSerializer(serializers.ModelSerializer):
     accuracy_rate = serializers.ReadOnlyField()
     is_due_for_review = serializers.ReadOnlyField()
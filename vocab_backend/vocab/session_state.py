@@ -0,0 +1,108 @@
+# ============================================================================
+# SESSION STATE - Write-behind cache for live QuizSession state
+# ============================================================================
+#
+# Answers change the retry queue, plan cursor and counters of a session
+# (and pruning deleted words changes the plan itself).
+# Instead of rewriting the QuizSession row every time, the live values sit
+# in Django's cache and are flushed to the database every few answers,
+# after a time limit, and when the session completes.
+#
+# QuizAttempt rows are still written per answer, so if the cache entry is
+# lost the state is rebuilt from the last flushed row by replaying the
+# attempts recorded after it.
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import QuizSession, QuizAttempt
+
+LIVE_FIELDS = [
+    'retry_queue', 'retry_requirements', 'question_plan', 'plan_cursor',
+    'total_questions', 'correct_answers', 'words_mastered_this_session',
+]
+
+
+def _cache():
+    return caches[getattr(settings, 'QUIZ_SESSION_CACHE', 'default')]
+
+def _key(session):
+    # started_at guards against a reused primary key picking up old state
+    return f"quiz_session:{session.pk}:{session.started_at.timestamp():.6f}"
+
+def load_session(session_id, user, queryset=None):
+    """Fetch a session with its live state applied (raises DoesNotExist)"""
+    queryset = queryset if queryset is not None else QuizSession.objects
+    session = queryset.get(id=session_id, user=user)
+    attach_live_state(session)
+    return session
+
+def attach_live_state(session):
+    """Overlay cached state on a session loaded from the database"""
+    entry = _cache().get(_key(session))
+    # A row flushed further ahead than the cache (another process) wins
+    if entry and entry['state']['total_questions'] >= session.total_questions:
+        for field, value in entry['state'].items():
+            setattr(session, field, value)
+        session._live_meta = {'dirty': entry['dirty'], 'flushed_at': entry['flushed_at']}
+    else:
+        replayed = recover_session(session)
+        session._live_meta = {'dirty': replayed, 'flushed_at': time.time()}
+    return session
+
+def recover_session(session):
+    """Replay attempts newer than the flushed row - returns how many"""
+    if not session.is_active:
+        return 0
+
+    attempts = QuizAttempt.objects.filter(
+        session=session, question_order__gt=session.total_questions
+    ).order_by('question_order').values_list(
+        'word_id', 'is_correct', 'mastery_before', 'mastery_after',
+        'consecutive_correct_after'
+    )
+
+    replayed = 0
+    for word_id, is_correct, mastery_before, mastery_after, consecutive in attempts:
+        # Same retry rules as views.apply_answer
+        if is_correct:
+            if word_id in session.retry_queue:
+                session.check_retry_completion(word_id, consecutive, save=False)
+        elif word_id not in session.retry_queue:
+            session.add_to_retry_queue(word_id, required_consecutive=2, save=False)
+
+        session.advance_plan(word_id)
+        session.total_questions += 1
+        if is_correct:
+            session.correct_answers += 1
+        if mastery_after >= 6 and mastery_before < 6:
+            session.words_mastered_this_session += 1
+        replayed += 1
+    return replayed
+
+def save_session(session, flush=False):
+    """Record live state in the cache, flushing to the database when due"""
+    meta = getattr(session, '_live_meta', None) or {'dirty': 0, 'flushed_at': time.time()}
+    meta = {'dirty': meta['dirty'] + 1, 'flushed_at': meta['flushed_at']}
+
+    flush_every = getattr(settings, 'QUIZ_SESSION_FLUSH_EVERY', 10)
+    flush_seconds = getattr(settings, 'QUIZ_SESSION_FLUSH_SECONDS', 60)
+    if (flush or meta['dirty'] >= flush_every
+            or time.time() - meta['flushed_at'] >= flush_seconds):
+        session.save(update_fields=LIVE_FIELDS)
+        meta = {'dirty': 0, 'flushed_at': time.time()}
+
+    session._live_meta = meta
+    entry = {'state': {field: getattr(session, field) for field in LIVE_FIELDS}, **meta}
+    key = _key(session)
+    # Only publish state that actually committed
+    transaction.on_commit(lambda: _cache().set(key, entry))
+
+def finish_session(session):
+    """Write the full row and drop the cache entry (session complete)"""
+    session.save()
+    key = _key(session)
+    transaction.on_commit(lambda: _cache().delete(key))
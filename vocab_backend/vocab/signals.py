@@ -0,0 +1,47 @@
+# ============================================================================
+# SIGNALS - Keep in-process catalog caches in sync with Word writes
+# ============================================================================
+
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .models import Word, GroupProgress, CatalogChange, UserWordProgress, UserStats
+from .distractors import distractor_index
+from .autocomplete import autocomplete_index
+from .search import update_index
+
+
+def notify_catalog_change(updated_ids=(), deleted_ids=(), group_numbers=()):
+    """Invalidate catalog-derived caches (also call after bulk writes)"""
+    distractor_index.invalidate()
+    autocomplete_index.invalidate()
+    # Rebuilds inside the open transaction would miss the write - drop again
+    transaction.on_commit(distractor_index.invalidate)
+    transaction.on_commit(autocomplete_index.invalidate)
+    # Group sizes are stored per user for the read-only progress endpoints
+    GroupProgress.refresh_totals(group_numbers)
+    CatalogChange.record(updated_ids, deleted_ids)
+    update_index(updated_ids, deleted_ids)
+
+
+@receiver(post_save, sender=Word)
+def word_saved(sender, instance, **kwargs):
+    notify_catalog_change(updated_ids=[instance.id], group_numbers=[instance.group_number])
+
+
+@receiver(pre_delete, sender=Word)
+def word_deleting(sender, instance, **kwargs):
+    # Progress on the word is cascade-deleted - note whose counters it was in
+    instance._removed_progress = list(
+        UserWordProgress.objects.filter(word=instance).values_list('user_id', 'mastery')
+    )
+
+
+@receiver(post_delete, sender=Word)
+def word_deleted(sender, instance, **kwargs):
+    notify_catalog_change(deleted_ids=[instance.id], group_numbers=[instance.group_number])
+    # Cascades bypass the dashboard and group counters
+    for user_id, mastery in getattr(instance, '_removed_progress', ()):
+        UserStats.reconcile_user(user_id)
+        GroupProgress.record_changes(user_id, instance.group_number, [(mastery, None)])
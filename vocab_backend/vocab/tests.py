@@ -1,3 +1,1506 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .models import (
+    Word, UserWordProgress, GroupProgress, QuizSession, QuizAttempt, WordStatShard,
+    UserStats, CatalogChange, CatalogVersion, WordNeighbors
+)
+from .search import _search_like
+from .admin import reset_user_progress
+from .autocomplete import autocomplete_index
+from .distractors import DistractorIndex, distractor_index
+from .neighbors import NeighborIndex, build_neighbor_index, neighbor_index
+from .renderers import FastJSONRenderer, packb
+from .session_state import LIVE_FIELDS, _key, load_session
+from .views import (
+    MAX_PREFETCH_QUESTIONS, build_adaptive_word_queue, adaptive_word_queryset,
+    existing_word_keys, generate_quiz_options,
+    start_adaptive_quiz, submit_adaptive_answer, sync_adaptive_answers
+)
+
+
+def make_words(count, group_number=1, prefix="word"):
+    return [
+        Word.objects.create(
+            word=f"{prefix}{i}", meaning=f"{prefix} meaning {i}",
+            group_number=group_number
+        )
+        for i in range(count)
+    ]
+
+
+# ============================================================================
+# ADAPTIVE RANKING
+# ============================================================================
+
+class AdaptiveRankingParityTests(TestCase):
+    """adaptive_word_queryset must rank exactly like build_adaptive_word_queue"""
+
+    def setUp(self):
+        self.user = User.objects.create(username="learner")
+        self.words = make_words(24)
+        self.words += make_words(6, group_number=2, prefix="other")
+
+        now = timezone.now()
+        cases = [
+            # (mastery, times_asked, times_correct, due_date)
+            (-4, 6, 1, None),
+            (-1, 3, 2, now - timedelta(days=1)),
+            (0, 0, 0, None),
+            (0, 2, 1, now + timedelta(days=1)),
+            (1, 4, 1, None),
+            (2, 2, 2, now - timedelta(hours=1)),
+            (3, 5, 2, None),
+            (3, 3, 3, now + timedelta(days=7)),
+            (5, 10, 4, now - timedelta(minutes=5)),
+            (6, 8, 8, None),
+            (9, 20, 9, now - timedelta(days=3)),
+            (12, 12, 12, now + timedelta(days=60)),
+        ]
+        # Leave every other word unstudied
+        for word, (mastery, asked, correct, due) in zip(self.words[::2], cases):
+            UserWordProgress.objects.create(
+                user=self.user, word=word, mastery=mastery,
+                times_asked=asked, times_correct=correct, due_date=due
+            )
+
+    def python_ranking(self, **kwargs):
+        queue = build_adaptive_word_queue(self.user, "adaptive_group", **kwargs)
+        return [(item['word'].id, item['priority']) for item in queue]
+
+    def sql_ranking(self, **kwargs):
+        return list(adaptive_word_queryset(self.user, **kwargs).values_list('id', 'priority'))
+
+    def test_all_words(self):
+        self.assertEqual(self.sql_ranking(), self.python_ranking())
+
+    def test_group(self):
+        self.assertEqual(self.sql_ranking(group_number=1), self.python_ranking(group_number=1))
+
+    def test_word_ids(self):
+        ids = [w.id for w in self.words[3:17]]
+        self.assertEqual(self.sql_ranking(word_ids=ids), self.python_ranking(word_ids=ids))
+
+    def test_other_users_progress_is_ignored(self):
+        other = User.objects.create(username="other")
+        for word in self.words[1::2]:
+            UserWordProgress.objects.create(user=other, word=word, mastery=9)
+        self.assertEqual(self.sql_ranking(), self.python_ranking())
+
+    def test_exclude_and_limit(self):
+        expected = [pair for pair in self.python_ranking()
+                    if pair[0] not in {self.words[0].id, self.words[1].id}][:5]
+        ranked = adaptive_word_queryset(
+            self.user, exclude_ids=[self.words[0].id, self.words[1].id]
+        )
+        self.assertEqual(list(ranked.values_list('id', 'priority')[:5]), expected)
+
+
+# ============================================================================
+# QUIZ OPTIONS
+# ============================================================================
+
+class NeighborIndexTests(TestCase):
+    """TF-IDF confusable neighbors and their use as hard distractors"""
+
+    def setUp(self):
+        # Fillers share one meaning pattern - too common to link anything
+        make_words(20, group_number=2, prefix="filler")
+        self.words = {
+            word: Word.objects.create(word=word, meaning=meaning, group_number=1,
+                                      word_grouping=grouping, synonyms=synonyms)
+            for word, meaning, grouping, synonyms in [
+                ("ephemeral", "Lasting a very short time", ["brevity"], ["evanescent"]),
+                ("transient", "Staying only briefly; impermanent", ["brevity"], []),
+                ("fleeting", "Passing quickly", ["brevity"], []),
+                ("fugitive", "Quick to disappear", ["brevity"], []),
+                # Same meaning, and a listed synonym - both also correct
+                ("momentary", "Lasting a very short time.", [], []),
+                ("evanescent", "Soon passing out of sight", ["brevity"], []),
+            ]
+        }
+        neighbor_index.invalidate()
+        distractor_index.invalidate()
+
+    def neighbors_of(self, word):
+        return [pair[0] for pair in
+                WordNeighbors.objects.get(word=self.words[word]).neighbors]
+
+    def ids(self, *words):
+        return {self.words[word].id for word in words}
+
+    def test_build(self):
+        self.assertEqual(build_neighbor_index(full=True), (Word.objects.count(), 0))
+        self.assertEqual(set(self.neighbors_of("ephemeral")),
+                         self.ids("transient", "fleeting", "fugitive"))
+        self.assertIn(self.words["ephemeral"].id, self.neighbors_of("transient"))
+        filler = Word.objects.get(word="filler0")
+        self.assertEqual(WordNeighbors.objects.get(word=filler).neighbors, [])
+
+    def test_near_synonyms_are_not_neighbors(self):
+        build_neighbor_index(full=True)
+        for word in ("momentary", "evanescent"):
+            self.assertNotIn(self.words[word].id, self.neighbors_of("ephemeral"))
+        self.assertNotIn(self.words["ephemeral"].id, self.neighbors_of("evanescent"))
+
+    def test_incremental_build_merges_new_words(self):
+        build_neighbor_index(full=True)
+        brief = Word.objects.create(word="brief", meaning="Of short duration",
+                                    group_number=1, word_grouping=["brevity"])
+
+        built, updated = build_neighbor_index()
+        self.assertEqual(built, 1)
+        self.assertGreater(updated, 0)
+        self.assertIn(brief.id, self.neighbors_of("ephemeral"))
+        self.assertIn(self.words["ephemeral"].id,
+                      [pair[0] for pair in WordNeighbors.objects.get(word=brief).neighbors])
+
+    def test_index_reloads_after_interval(self):
+        build_neighbor_index(full=True)
+        index = NeighborIndex()
+        word_id = self.words["ephemeral"].id
+        loaded = index.get(word_id)
+        self.assertEqual(set(loaded), self.ids("transient", "fleeting", "fugitive"))
+
+        # Rebuilt elsewhere (another process) - nothing invalidates this copy
+        WordNeighbors.objects.filter(word_id=word_id).update(neighbors=[])
+        self.assertEqual(index.get(word_id), loaded)
+
+        later = time.monotonic() + NeighborIndex.RELOAD_SECONDS + 1
+        with mock.patch("vocab.neighbors.time.monotonic", return_value=later):
+            self.assertEqual(index.get(word_id), ())
+
+    def test_options_prefer_neighbors(self):
+        build_neighbor_index(full=True)
+        word = self.words["ephemeral"]
+        expected = {word.meaning} | {
+            self.words[other].meaning for other in ("transient", "fleeting", "fugitive")
+        }
+        for _ in range(5):
+            self.assertEqual(set(generate_quiz_options(word)), expected)
+
+
+class DistractorIndexTests(TestCase):
+    """Sampling wrong-answer meanings and staying in step with the catalog"""
+
+    def setUp(self):
+        self.words = make_words(8)
+        Word.objects.create(word="blank", meaning="   ", group_number=1)
+        self.index = DistractorIndex()
+
+    def test_sample_skips_the_correct_answer(self):
+        correct = self.words[0]
+        for _ in range(20):
+            picked = self.index.sample(correct.id, correct.meaning, k=3)
+            self.assertEqual(len(set(picked)), 3)
+            self.assertNotIn(correct.meaning, picked)
+            self.assertNotIn("", [meaning.strip() for meaning in picked])
+
+    def test_preferred_ids_come_first(self):
+        correct, preferred = self.words[0], self.words[1:3]
+        picked = self.index.sample(correct.id, correct.meaning, k=3,
+                                   preferred_ids=[correct.id] + [w.id for w in preferred])
+        self.assertEqual(set(picked[:2]), {w.meaning for w in preferred})
+        self.assertNotIn(correct.meaning, picked)
+
+    def test_small_catalog_returns_what_there_is(self):
+        Word.objects.exclude(id__in=[w.id for w in self.words[:3]]).delete()
+        correct = self.words[0]
+        picked = self.index.sample(correct.id, correct.meaning, k=3)
+        self.assertEqual(sorted(picked), sorted(w.meaning for w in self.words[1:3]))
+
+    def test_other_process_writes_are_picked_up(self):
+        word = self.words[1]
+        self.index.sample(self.words[0].id, self.words[0].meaning)
+
+        # Written elsewhere: no signal here, only the catalog version moves
+        Word.objects.filter(id=word.id).update(meaning="rewritten elsewhere")
+        later = time.monotonic() + DistractorIndex.VERSION_CHECK_SECONDS + 1
+        with mock.patch("vocab.catalog_index.time.monotonic", return_value=later):
+            with self.assertNumQueries(1):  # Version unchanged - no rebuild
+                self.index.sample(self.words[0].id, self.words[0].meaning)
+            self.assertNotIn("rewritten elsewhere", self.index._ensure_built()[1])
+
+        CatalogVersion.bump()
+        later += DistractorIndex.VERSION_CHECK_SECONDS + 1
+        with mock.patch("vocab.catalog_index.time.monotonic", return_value=later):
+            self.assertIn("rewritten elsewhere", self.index._ensure_built()[1])
+
+
+# ============================================================================
+# QUESTION FLOW
+# ============================================================================
+
+class QuizSessionTestCase(TestCase):
+    """A started group 1 session and helpers to walk it over the API"""
+
+    def setUp(self):
+        self.user = User.objects.create(username="demo")
+        self.words = {word.id: word for word in make_words(6)}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/quiz/adaptive/start/", {"group_number": 1},
+                content_type="application/json"
+            )
+        self.session_id = response.json()["session_id"]
+        self.url = f"/api/quiz/adaptive/{self.session_id}"
+
+    def session(self):
+        return load_session(self.session_id, self.user)
+
+    def question(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get(f"{self.url}/question/").json()
+
+    def answer(self, word_id, correct=True, **extra):
+        word = self.words[word_id]
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f"{self.url}/answer/",
+                {"word_id": word_id, "answer": word.meaning if correct else "nope", **extra},
+                content_type="application/json"
+            ).json()
+
+
+class QuestionPlanTests(QuizSessionTestCase):
+    """The precomputed plan and its cursor drive question order"""
+
+    def test_plan_follows_adaptive_ranking(self):
+        self.assertEqual(
+            self.session().question_plan,
+            list(adaptive_word_queryset(self.user, group_number=1).values_list('id', flat=True))
+        )
+
+    def test_advance_plan_only_moves_past_the_next_word(self):
+        session = QuizSession(question_plan=[5, 6, 7])
+        self.assertFalse(session.advance_plan(6))
+        self.assertFalse(session.advance_plan(None))
+        self.assertTrue(session.advance_plan(5))
+        self.assertEqual((session.plan_cursor, session.next_planned_word_id()), (1, 6))
+        session.plan_cursor = 3
+        self.assertIsNone(session.next_planned_word_id())
+
+    def test_answered_and_retried_words_are_not_asked_again(self):
+        plan = self.session().question_plan
+        wrong_once = {plan[1]}
+        asked = []
+        for _ in range(3 * len(plan)):
+            question = self.question()
+            if question.get("session_complete"):
+                break
+            asked.append((question["word_id"], question["is_retry"]))
+            self.answer(question["word_id"], correct=question["word_id"] not in wrong_once)
+            wrong_once.discard(question["word_id"])
+
+        # plan[1] comes back from the retry queue until two correct in a row
+        expected = [(plan[0], False), (plan[1], False), (plan[1], True), (plan[1], True)]
+        expected += [(word_id, False) for word_id in plan[2:]]
+        self.assertEqual(asked, expected)
+        self.assertEqual(self.session().plan_cursor, len(plan))
+
+    def test_deleted_words_are_skipped(self):
+        plan = self.session().question_plan
+        Word.objects.filter(id=plan[0]).delete()
+        self.assertEqual(self.question()["word_id"], plan[1])
+        self.assertEqual(self.session().plan_cursor, 1)
+
+
+class PrefetchQuestionsTests(QuizSessionTestCase):
+    """questions/?n= returns what n one-by-one requests would (all correct)"""
+
+    FIELDS = ("word_id", "word", "pronunciation", "is_retry")
+
+    def key(self, question):
+        return tuple(question[field] for field in self.FIELDS)
+
+    def sequential(self, count):
+        asked = []
+        for _ in range(count):
+            question = self.question()
+            if question.get("session_complete"):
+                break
+            asked.append(self.key(question))
+            self.answer(question["word_id"])
+        return asked
+
+    def prefetch(self, count):
+        response = self.client.get(f"{self.url}/questions/", {"n": count}).json()
+        return [self.key(question) for question in response["questions"]]
+
+    def test_batch_matches_sequential_questions(self):
+        self.answer(self.question()["word_id"])
+        batch = self.prefetch(3)
+        self.assertEqual(len(batch), 3)
+        self.assertEqual(batch, self.sequential(3))
+
+    def test_batch_with_retry_queue_matches_sequential_questions(self):
+        # A wrong answer puts the word in the retry queue (two correct to clear)
+        self.answer(self.question()["word_id"], correct=False)
+        batch = self.prefetch(5)
+        self.assertEqual([is_retry for *_, is_retry in batch][:3], [True, True, False])
+        self.assertEqual(batch, self.sequential(5))
+
+    def test_batch_stops_at_the_end_of_the_plan(self):
+        batch = self.prefetch(MAX_PREFETCH_QUESTIONS)
+        self.assertEqual(len(batch), len(self.words))
+        self.assertEqual(batch, self.sequential(len(self.words) + 1))
+
+    def test_deleted_words_are_pruned_through_live_state(self):
+        plan = self.session().question_plan
+        Word.objects.filter(id=plan[1]).delete()
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                batch = self.prefetch(3)
+        self.assertNotIn(plan[1], [word_id for word_id, *_ in batch])
+        self.assertFalse([q for q in queries if q["sql"].startswith('UPDATE "vocab_quizsession"')])
+        self.assertEqual(self.session().question_plan, plan[:1] + plan[2:])
+
+
+class IncludeNextQuestionTests(QuizSessionTestCase):
+    """answer/ with include_next returns what the follow-up GET would"""
+
+    def assertSameQuestion(self, piggybacked, fetched):
+        # Distractors are sampled per request - compare everything else
+        options = piggybacked.pop("options", None), fetched.pop("options", None)
+        self.assertEqual(piggybacked, fetched)
+        if fetched.get("word_id"):
+            meaning = self.words[fetched["word_id"]].meaning
+            for choices in options:
+                self.assertEqual(len(choices), 4)
+                self.assertIn(meaning, choices)
+
+    def test_next_plan_word(self):
+        response = self.answer(self.question()["word_id"], include_next=True)
+        self.assertFalse(response["next_question"]["is_retry"])
+        self.assertSameQuestion(response["next_question"], self.question())
+
+    def test_retried_word_reuses_its_progress(self):
+        word_id = self.question()["word_id"]
+        response = self.answer(word_id, correct=False, include_next=True)
+        self.assertEqual(response["next_question"]["word_id"], word_id)
+        self.assertTrue(response["next_question"]["is_retry"])
+        self.assertSameQuestion(response["next_question"], self.question())
+
+    def test_query_string_flag(self):
+        word_id = self.question()["word_id"]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"{self.url}/answer/?include_next=1",
+                {"word_id": word_id, "answer": self.words[word_id].meaning},
+                content_type="application/json"
+            ).json()
+        self.assertSameQuestion(response["next_question"], self.question())
+
+    def test_last_answer_returns_completion(self):
+        for _ in range(len(self.words) - 1):
+            self.answer(self.question()["word_id"])
+        response = self.answer(self.question()["word_id"], include_next=True)
+        self.assertTrue(response["next_question"]["session_complete"])
+        self.assertSameQuestion(response["next_question"], self.question())
+
+    def test_not_requested(self):
+        self.assertNotIn("next_question", self.answer(self.question()["word_id"]))
+
+
+# ============================================================================
+# ANSWER WRITE PATH
+# ============================================================================
+
+@override_settings(QUIZ_SESSION_FLUSH_EVERY=1000, QUIZ_SESSION_FLUSH_SECONDS=3600)
+class SubmitAnswerQueryBudgetTests(TestCase):
+    """Keep submit_adaptive_answer on its minimal write set"""
+
+    # user, session, word, savepoint, progress read, progress UPDATE,
+    # user stats UPDATE, group progress read, word stat shard UPDATE,
+    # attempt INSERT, streak read, release savepoint
+    ANSWER_QUERY_BUDGET = 12
+
+    def setUp(self):
+        self.user = User.objects.create(username="demo")
+        self.words = make_words(5)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/quiz/adaptive/start/", {"group_number": 1},
+                content_type="application/json"
+            )
+        self.session_id = response.json()["session_id"]
+
+    def answer(self, word, correct=True):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f"/api/quiz/adaptive/{self.session_id}/answer/",
+                {"word_id": word.id, "answer": word.meaning if correct else "nope"},
+                content_type="application/json"
+            )
+
+    def test_repeat_answer_query_budget(self):
+        word = self.words[0]
+        self.answer(word)  # Creates progress and today's streak
+
+        with self.assertNumQueries(self.ANSWER_QUERY_BUDGET):
+            response = self.answer(word)
+        self.assertEqual(response.status_code, 200)
+
+    def test_wrong_answer_query_budget(self):
+        word = self.words[1]
+        self.answer(word)
+
+        with self.assertNumQueries(self.ANSWER_QUERY_BUDGET):
+            response = self.answer(word, correct=False)
+        self.assertTrue(response.json()["retry_status"]["added_to_retry"])
+
+    def test_stats_and_session_state(self):
+        word = self.words[2]
+        self.answer(word)
+        self.answer(word, correct=False)
+
+        word.refresh_from_db()
+        self.assertEqual((word.total_attempts, word.total_correct), (0, 0))
+        WordStatShard.rollup()
+        word.refresh_from_db()
+        self.assertEqual((word.total_attempts, word.total_correct), (2, 1))
+
+        session = load_session(self.session_id, self.user)
+        self.assertEqual(session.total_questions, 2)
+        self.assertEqual(session.retry_queue, [word.id])
+
+    @override_settings(QUIZ_SESSION_FLUSH_EVERY=2)
+    def test_session_flush_costs_one_write(self):
+        word = self.words[3]
+        self.answer(word)
+
+        with self.assertNumQueries(self.ANSWER_QUERY_BUDGET + 1):
+            self.answer(word)
+        self.assertEqual(QuizSession.objects.get(id=self.session_id).total_questions, 2)
+
+
+class AnswerSyncTests(TestCase):
+    """answers/sync/: fixed query count, same end state as one-by-one submits"""
+
+    # Repeated answers cycle over these (word index, correct)
+    SCRIPT = [(0, True), (1, False), (0, True), (2, True), (1, False),
+              (1, True), (2, False), (0, False), (2, True), (1, True)]
+
+    SYNC_QUERIES = 16
+
+    def setUp(self):
+        self.words = make_words(6)
+
+    def call(self, user, view, data=None, **kwargs):
+        request = APIRequestFactory().post("/", data or {}, format="json")
+        request._demo_user = user  # get_active_user() picks this up
+        with self.captureOnCommitCallbacks(execute=True):
+            return view(request, **kwargs)
+
+    def start(self, user):
+        return self.call(user, start_adaptive_quiz, {"group_number": 1}).data["session_id"]
+
+    def answers(self, script):
+        return [{"word_id": self.words[i].id,
+                 "answer": self.words[i].meaning if correct else "nope"}
+                for i, correct in script]
+
+    def snapshot(self, user, session_id):
+        progress = {
+            p.word_id: (p.mastery, p.times_asked, p.times_correct, p.consecutive_correct,
+                        p.interval_days, p.review_count, p.is_learning,
+                        p.marked_for_review, p.due_date is None)
+            for p in UserWordProgress.objects.filter(user=user)
+        }
+        session = load_session(session_id, user)
+        session_state = (session.total_questions, session.correct_answers,
+                         session.unique_words_practiced, session.retry_queue,
+                         session.retry_requirements, session.plan_cursor,
+                         session.words_mastered_this_session)
+        attempts = list(QuizAttempt.objects.filter(session_id=session_id).order_by("id")
+                        .values_list("word_id", "is_correct", "mastery_before",
+                                     "mastery_after", "is_retry_attempt", "question_order"))
+        stats = UserStats.objects.get(user=user)
+        counters = [getattr(stats, field) for field in UserStatsTests.COUNTERS
+                    if field != "next_due_at"]
+        return progress, session_state, attempts, counters
+
+    def test_same_state_as_sequential_submits(self):
+        one_by_one, batched = User.objects.create(username="a"), User.objects.create(username="b")
+
+        sequential_id = self.start(one_by_one)
+        for answer in self.answers(self.SCRIPT):
+            self.call(one_by_one, submit_adaptive_answer, answer, session_id=sequential_id)
+
+        synced_id = self.start(batched)
+        response = self.call(batched, sync_adaptive_answers,
+                             {"answers": self.answers(self.SCRIPT)}, session_id=synced_id)
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.snapshot(batched, synced_id),
+                         self.snapshot(one_by_one, sequential_id))
+        due = lambda user: dict(UserWordProgress.objects.filter(user=user)
+                                .values_list("word_id", "due_date"))
+        for word_id, due_date in due(batched).items():
+            expected = due(one_by_one)[word_id]
+            if due_date is not None:
+                self.assertAlmostEqual(due_date, expected, delta=timedelta(seconds=30))
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        user = User.objects.create(username="demo")
+        session_id = self.start(user)
+        url = f"/api/quiz/adaptive/{session_id}/answers/sync/"
+        # Two words kept right and one kept wrong, so no batch below moves a
+        # word across the group's mastery threshold (an extra UPDATE)
+        round_ = [(0, True), (1, False), (2, True)]
+        # First sync creates the progress, stat shard and streak rows
+        self.client.post(url, {"answers": self.answers(round_ * 5)},
+                         content_type="application/json")
+
+        # Same three words either way - 3 answers or 30 cost the same
+        # (stat shards are bumped with one UPDATE per distinct delta)
+        for script in (round_, round_ * 10):
+            with self.assertNumQueries(self.SYNC_QUERIES):
+                response = self.client.post(url, {"answers": self.answers(script)},
+                                            content_type="application/json")
+            self.assertEqual(len(response.json()["results"]), len(script))
+
+@override_settings(QUIZ_SESSION_FLUSH_EVERY=1000, QUIZ_SESSION_FLUSH_SECONDS=3600)
+class SessionWriteBehindTests(TestCase):
+    """Live session state: cache loss is recovered, completion flushes"""
+
+    # (word index, correct) - word 0 enters and clears the retry queue,
+    # word 1 is left in it
+    SCRIPT = [(0, False), (1, True), (0, True), (2, True), (0, True), (1, False)]
+
+    def setUp(self):
+        self.user = User.objects.create(username="demo")
+        self.words = make_words(5)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/quiz/adaptive/start/", {"group_number": 1},
+                content_type="application/json"
+            )
+        self.session_id = response.json()["session_id"]
+
+    def answer(self, index, correct):
+        word = self.words[index]
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                f"/api/quiz/adaptive/{self.session_id}/answer/",
+                {"word_id": word.id, "answer": word.meaning if correct else "nope"},
+                content_type="application/json"
+            )
+
+    def live_state(self):
+        session = load_session(self.session_id, self.user)
+        return {field: getattr(session, field) for field in LIVE_FIELDS}
+
+    def test_cache_loss_is_recovered_from_attempts(self):
+        for index, correct in self.SCRIPT[:4]:
+            self.answer(index, correct)
+        expected = self.live_state()
+        self.assertEqual(expected["total_questions"], 4)
+        # Nothing flushed yet - only the cache knows
+        self.assertEqual(QuizSession.objects.get(id=self.session_id).total_questions, 0)
+
+        caches["quiz_sessions"].clear()
+        self.assertEqual(self.live_state(), expected)
+
+        # Answering carries on from the recovered state
+        for index, correct in self.SCRIPT[4:]:
+            self.answer(index, correct)
+        state = self.live_state()
+        self.assertEqual(state["total_questions"], len(self.SCRIPT))
+        self.assertEqual(state["correct_answers"], 4)
+        self.assertEqual(state["retry_queue"], [self.words[1].id])
+
+    def test_completion_flushes_to_the_database(self):
+        for index, correct in self.SCRIPT:
+            self.answer(index, correct)
+        expected = self.live_state()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/api/quiz/adaptive/{self.session_id}/complete/")
+        self.assertEqual(response.json()["performance"]["total_questions"], len(self.SCRIPT))
+
+        row = QuizSession.objects.get(id=self.session_id)
+        self.assertFalse(row.is_active)
+        self.assertEqual({field: getattr(row, field) for field in LIVE_FIELDS}, expected)
+        self.assertIsNone(caches["quiz_sessions"].get(_key(row)))
+
+
+# ============================================================================
+# DASHBOARD STATS
+# ============================================================================
+
+class UserStatsTests(TestCase):
+    """Incremental UserStats counters must agree with a full reconcile"""
+
+    COUNTERS = [
+        'struggling', 'learning', 'practicing', 'mastered', 'total_studied',
+        'low_mastery_count', 'due_count', 'next_due_at', 'daily_totals',
+    ]
+
+    def setUp(self):
+        self.user = User.objects.create(username="demo")
+        self.words = make_words(6)
+        # Existing history, picked up when the first write creates the row
+        UserWordProgress.objects.create(user=self.user, word=self.words[5], mastery=7)
+
+    def dashboard(self):
+        return self.client.get("/api/quiz/dashboard/").json()
+
+    def post(self, url, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, data, content_type="application/json")
+
+    def assert_reconciled(self):
+        stats = UserStats.objects.get(user=self.user)
+        incremental = {field: getattr(stats, field) for field in self.COUNTERS}
+        stats.reconcile()
+        for field in self.COUNTERS:
+            self.assertEqual(incremental[field], getattr(stats, field), field)
+
+    def test_answers_mark_read_and_completion(self):
+        self.assertEqual(self.dashboard()["mastery_distribution"]["total_studied"], 1)
+        self.assertFalse(UserStats.objects.filter(user=self.user).exists())
+
+        session_id = self.post("/api/quiz/adaptive/start/", {"group_number": 1}).json()["session_id"]
+        answer_url = f"/api/quiz/adaptive/{session_id}/answer/"
+        for word, correct in [(self.words[0], True), (self.words[0], True),
+                              (self.words[1], False), (self.words[2], True)]:
+            self.post(answer_url, {
+                "word_id": word.id, "answer": word.meaning if correct else "nope"
+            })
+        self.post("/api/words/mark-read/", {"word_id": self.words[3].id})
+        self.post(f"/api/quiz/adaptive/{session_id}/answers/sync/", {"answers": [
+            {"word_id": self.words[1].id, "answer": "nope"},
+            {"word_id": self.words[4].id, "answer": self.words[4].meaning},
+        ]})
+        self.post(f"/api/quiz/adaptive/{session_id}/complete/", {})
+
+        self.assert_reconciled()
+        data = self.dashboard()
+        self.assertEqual(data["mastery_distribution"]["total_studied"], 6)
+        self.assertEqual(data["low_mastery"]["count"], 2)
+        self.assertEqual(sorted(data["low_mastery"]["word_ids"]),
+                         [self.words[1].id, self.words[3].id])
+        self.assertEqual(data["recent_performance"]["sessions_count"], 1)
+        self.assertEqual(data["recent_performance"]["total_questions"], 6)
+
+    def test_completing_twice_records_the_session_once(self):
+        session_id = self.post("/api/quiz/adaptive/start/", {"group_number": 1}).json()["session_id"]
+        word = self.words[0]
+        self.post(f"/api/quiz/adaptive/{session_id}/answer/",
+                  {"word_id": word.id, "answer": word.meaning})
+        first = self.post(f"/api/quiz/adaptive/{session_id}/complete/", {}).json()
+        again = self.post(f"/api/quiz/adaptive/{session_id}/complete/", {}).json()
+
+        self.assertEqual(again["completed_at"], first["completed_at"])
+        self.assertEqual(again["performance"], first["performance"])
+        self.assert_reconciled()
+        self.assertEqual(self.dashboard()["recent_performance"]["sessions_count"], 1)
+
+    def test_deleting_a_word_recounts_its_learners(self):
+        UserWordProgress.objects.create(user=self.user, word=self.words[0], mastery=-1)
+        UserWordProgress.objects.create(user=self.user, word=self.words[1], mastery=0)
+        UserStats.reconcile_user(self.user.pk)
+
+        self.words[0].delete()
+        self.assert_reconciled()
+        data = self.dashboard()
+        self.assertEqual(data["mastery_distribution"]["total_studied"], 2)
+        self.assertEqual(data["low_mastery"]["count"], 1)
+        self.assertEqual(data["low_mastery"]["word_ids"], [self.words[1].id])
+
+    def test_due_count_refreshes_when_reviews_come_due(self):
+        progress = UserWordProgress.objects.get(user=self.user, word=self.words[5])
+        progress.marked_for_review = True
+        progress.due_date = timezone.now() + timedelta(seconds=1)
+        progress.save()
+        UserStats(user=self.user).reconcile()
+        self.assertEqual(self.dashboard()["due_reviews"]["count"], 0)
+
+        UserWordProgress.objects.filter(pk=progress.pk).update(
+            due_date=timezone.now() - timedelta(seconds=1)
+        )
+        UserStats.objects.filter(user=self.user).update(
+            next_due_at=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(self.dashboard()["due_reviews"]["count"], 1)
+
+
+# ============================================================================
+# GROUP PROGRESS
+# ============================================================================
+
+class GroupProgressTests(TestCase):
+    """Completion is tracked on answers; progress reads never write"""
+
+    def setUp(self):
+        self.user = User.objects.create(username="demo")
+        self.words = make_words(3)
+        make_words(2, group_number=2, prefix="other")
+        response = self.post("/api/quiz/adaptive/start/", {"group_number": 1})
+        self.session_id = response.json()["session_id"]
+
+    def post(self, url, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, data, content_type="application/json")
+
+    def answer(self, word, correct=True):
+        return self.post(f"/api/quiz/adaptive/{self.session_id}/answer/", {
+            "word_id": word.id, "answer": word.meaning if correct else "nope"
+        })
+
+    def group(self):
+        return GroupProgress.objects.get(user=self.user, group_number=1)
+
+    def assert_recount_agrees(self):
+        group = self.group()
+        incremental = (group.words_total, group.words_started, group.words_mastered)
+        group.check_and_update_completion()
+        self.assertEqual(incremental, (group.words_total, group.words_started,
+                                       group.words_mastered))
+
+    def test_counters_follow_threshold_crossings(self):
+        for _ in range(3):
+            self.answer(self.words[0])
+        self.answer(self.words[1])
+        self.assertEqual((self.group().words_started, self.group().words_mastered), (2, 1))
+        self.assert_recount_agrees()
+
+        self.answer(self.words[0], correct=False)  # 3 -> 1 drops below threshold
+        self.assertEqual(self.group().words_mastered, 0)
+        self.assert_recount_agrees()
+
+    def test_group_completes_on_the_answer_that_masters_it(self):
+        for word in self.words:
+            for _ in range(3):
+                self.answer(word)
+        group = self.group()
+        self.assertTrue(group.is_completed)
+        self.assertEqual(UserWordProgress.objects.filter(
+            user=self.user, marked_for_review=True
+        ).count(), 3)
+
+    def test_deleted_words_leave_the_counters(self):
+        for _ in range(3):
+            self.answer(self.words[0])
+        self.answer(self.words[1])
+
+        self.words[0].delete()
+        group = self.group()
+        self.assertEqual((group.words_total, group.words_started, group.words_mastered),
+                         (2, 1, 0))
+        self.assert_recount_agrees()
+
+    def test_admin_reset_unmasters_words(self):
+        for _ in range(3):
+            self.answer(self.words[0])
+        self.answer(self.words[1])
+
+        reset_user_progress(mock.Mock(), None, UserWordProgress.objects.filter(user=self.user))
+        self.assertEqual((self.group().words_started, self.group().words_mastered), (2, 0))
+        self.assert_recount_agrees()
+
+    def test_new_words_update_stored_totals(self):
+        self.answer(self.words[0])
+        Word.objects.create(word="late", meaning="late meaning", group_number=1)
+        self.assertEqual(self.group().words_total, 4)
+
+    def test_read_endpoints_do_not_write(self):
+        self.answer(self.words[0])
+        # The first groups listing creates the missing GroupProgress rows
+        self.client.get("/api/groups/detailed/")
+        urls = [
+            "/api/quiz/dashboard/",
+            "/api/groups/detailed/",
+            f"/api/quiz/adaptive/{self.session_id}/question/",
+        ]
+        for url in urls:
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.client.get(url).status_code, 200, url)
+            writes = [q["sql"] for q in ctx.captured_queries
+                      if q["sql"].split()[0] in ("INSERT", "UPDATE", "DELETE")]
+            self.assertEqual(writes, [], url)
+
+    def test_groups_listing_matches_recount_in_constant_queries(self):
+        for _ in range(3):
+            self.answer(self.words[0])
+        self.answer(self.words[1])
+        self.client.get("/api/groups/detailed/")
+
+        # user, aggregate, GroupProgress rows - however many groups exist
+        with self.assertNumQueries(3):
+            groups = self.client.get("/api/groups/detailed/").json()["groups"]
+        make_words(4, group_number=3, prefix="more")
+        with self.assertNumQueries(3 + 2):  # + INSERT, progress version bump
+            groups = self.client.get("/api/groups/detailed/").json()["groups"]
+        self.assertEqual(len(groups), 3)
+
+        for listed in groups:
+            group = GroupProgress.objects.get(user=self.user, group_number=listed["group_number"])
+            group.check_and_update_completion()
+            self.assertEqual(
+                (listed["total_words"], listed["words_started"], listed["words_mastered"]),
+                (group.words_total, group.words_started, group.words_mastered)
+            )
+
+    def test_completion_schedules_reviews_in_constant_queries(self):
+        words = make_words(1000, group_number=7, prefix="big")
+        UserWordProgress.objects.bulk_create([
+            UserWordProgress(user=self.user, word=word, mastery=3 + i % 10)
+            for i, word in enumerate(words)
+        ])
+        group = GroupProgress.objects.create(user=self.user, group_number=7)
+
+        # total, started, mastered, scheduling UPDATE, stats read,
+        # due recount (count, next due, save), group save
+        with self.assertNumQueries(9):
+            self.assertTrue(group.check_and_update_completion())
+
+        for progress in UserWordProgress.objects.filter(word__group_number=7)[:20]:
+            self.assertTrue(progress.marked_for_review)
+            expected = progress.calculate_next_due_date()
+            self.assertLess(abs(expected - progress.due_date), timedelta(minutes=1))
+
+
+# ============================================================================
+# CONDITIONAL GETS
+# ============================================================================
+
+class ConditionalGetTests(TestCase):
+    """Polled read endpoints answer 304 until something they show changes"""
+
+    URLS = ["/api/quiz/dashboard/", "/api/groups/summary/", "/api/reviews/due/"]
+
+    def setUp(self):
+        self.user = User.objects.create(username="demo")
+        self.words = make_words(4)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/quiz/adaptive/start/", {"group_number": 1},
+                content_type="application/json"
+            )
+        self.session_id = response.json()["session_id"]
+
+    def etags(self):
+        return {url: self.client.get(url)["ETag"] for url in self.URLS}
+
+    def test_dashboard_tag_changes_at_midnight(self):
+        etag = self.client.get("/api/quiz/dashboard/")["ETag"]
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        with mock.patch("django.utils.timezone.localdate", return_value=tomorrow):
+            response = self.client.get("/api/quiz/dashboard/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def assert_not_modified(self, etags):
+        for url, etag in etags.items():
+            # user, progress version, catalog version
+            with self.assertNumQueries(3):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304, url)
+            self.assertEqual(response["ETag"], etag)
+
+    def test_unchanged_progress_is_not_modified(self):
+        self.assert_not_modified(self.etags())
+
+    def test_answers_change_the_etag(self):
+        before = self.etags()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/api/quiz/adaptive/{self.session_id}/answer/",
+                {"word_id": self.words[0].id, "answer": self.words[0].meaning},
+                content_type="application/json"
+            )
+        after = self.etags()
+        for url in self.URLS:
+            self.assertNotEqual(before[url], after[url])
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=before[url]).status_code, 200)
+        self.assert_not_modified(after)
+
+    def test_catalog_changes_change_the_etag(self):
+        before = self.etags()
+        Word.objects.create(word="new", meaning="new meaning", group_number=2)
+        self.assertNotEqual(before, self.etags())
+
+    def test_passing_due_date_changes_the_etag(self):
+        progress = UserWordProgress.objects.create(
+            user=self.user, word=self.words[0], marked_for_review=True,
+            due_date=timezone.now() + timedelta(days=1)
+        )
+        UserStats.objects.get(user=self.user).reconcile()
+        before = self.etags()
+
+        UserWordProgress.objects.filter(pk=progress.pk).update(
+            due_date=timezone.now() - timedelta(seconds=1)
+        )
+        UserStats.objects.filter(user=self.user).update(
+            next_due_at=timezone.now() - timedelta(seconds=1)
+        )
+        after = self.etags()
+        self.assertNotEqual(before, after)
+        self.assertEqual(self.client.get("/api/reviews/due/").json()["count"], 1)
+
+    def test_stat_rollups_keep_the_etag(self):
+        before = self.etags()
+        WordStatShard.record(self.words[0].id, self.user.pk)
+        WordStatShard.rollup()
+        self.assert_not_modified(before)
+
+    def test_users_without_a_stats_row_get_a_due_boundary(self):
+        # Progress from before UserStats existed - nothing backfilled a row
+        UserStats.objects.filter(user=self.user).delete()
+        progress = UserWordProgress.objects.create(
+            user=self.user, word=self.words[0], marked_for_review=True,
+            due_date=timezone.now() + timedelta(hours=1)
+        )
+        before = self.etags()
+
+        UserWordProgress.objects.filter(pk=progress.pk).update(
+            due_date=timezone.now() - timedelta(seconds=1)
+        )
+        for url, etag in before.items():
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200, url)
+        self.assertEqual(self.client.get("/api/reviews/due/").json()["count"], 1)
+
+
+# ============================================================================
+# WORD LISTS
+# ============================================================================
+
+class WordsByCriteriaTests(TestCase):
+    """Joined filters and keyset pagination for get_words_by_criteria"""
+
+    URL = "/api/words/by-criteria/"
+
+    def setUp(self):
+        self.user = User.objects.create(username="demo")
+        self.words = make_words(12) + make_words(8, group_number=2, prefix="two")
+        for word, mastery in zip(self.words[::3], [-2, 0, 3, 6, 1, 4, 7]):
+            UserWordProgress.objects.create(
+                user=self.user, word=word, mastery=mastery, times_asked=4, times_correct=1,
+                marked_for_review=mastery >= 3,
+                due_date=timezone.now() - timedelta(hours=1) if mastery >= 3 else None
+            )
+
+    def get(self, **params):
+        return self.client.get(self.URL, params).json()
+
+    def walk(self, **params):
+        ids, cursor = [], ""
+        while cursor is not None:
+            data = self.get(cursor=cursor, **params)
+            ids += [w["id"] for w in data["words"]]
+            cursor = data["pagination"]["next_cursor"]
+        return ids
+
+    def test_cursor_walk_matches_offset_order(self):
+        offset_ids = [w["id"] for w in self.get(limit=100)["words"]]
+        self.assertEqual(offset_ids, [w.id for w in self.words])
+        self.assertEqual(self.walk(limit=7), offset_ids)
+
+    def test_filters_are_applied_in_sql(self):
+        low = self.get(mastery_max=0)
+        self.assertEqual([w["mastery"] for w in low["words"]], [-2, 0])
+        self.assertEqual(low["pagination"]["total_available"], 2)
+        self.assertEqual(low["words"][0]["accuracy_rate"], 25.0)
+
+        due = self.walk(due_for_review="true", limit=2)
+        self.assertEqual(len(due), 4)
+        self.assertEqual(self.walk(group=2, mastery_min=1, limit=1),
+                         [w["id"] for w in self.get(group=2, mastery_min=1)["words"]])
+
+    def test_deep_pages_cost_the_same(self):
+        first = self.get(cursor="", limit=3)
+        deep = self.get(cursor="", limit=17)["pagination"]["next_cursor"]
+        # user, one page query
+        with self.assertNumQueries(2):
+            self.client.get(self.URL, {"cursor": first["pagination"]["next_cursor"], "limit": 3})
+        with self.assertNumQueries(2):
+            last = self.get(cursor=deep, limit=3)
+        self.assertEqual(len(last["words"]), 3)
+        self.assertFalse(last["pagination"]["has_more"])
+
+    def test_bad_cursor(self):
+        self.assertEqual(self.client.get(self.URL, {"cursor": "nope"}).status_code, 400)
+
+    def test_limit_must_be_positive(self):
+        for limit in ("0", "-3", "ten"):
+            for params in ({"limit": limit}, {"limit": limit, "cursor": ""}):
+                self.assertEqual(self.client.get(self.URL, params).status_code, 400)
+
+    def test_sparse_fields_and_columnar_shape(self):
+        records = self.get(fields="word,mastery", limit=5)["words"]
+        self.assertEqual(list(records[0]), ["id", "word", "mastery"])
+
+        columns = self.get(fields="word,mastery", limit=5, shape="columnar")["words"]
+        self.assertEqual(columns, {
+            field: [row[field] for row in records] for field in ("id", "word", "mastery")
+        })
+        self.assertEqual(self.client.get(self.URL, {"fields": "nope"}).status_code, 400)
+
+
+class WordCatalogFieldsTests(TestCase):
+    """?fields= and ?shape= on /api/words/"""
+
+    def setUp(self):
+        self.words = make_words(3)
+
+    def test_fields_are_pushed_down(self):
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get("/api/words/", {"fields": "word,meaning"}).json()
+        self.assertEqual(data[0], {"id": self.words[0].id, "word": "word0",
+                                   "meaning": "word meaning 0"})
+        self.assertNotIn("etymology", ctx.captured_queries[-1]["sql"])
+
+    def test_columnar_list(self):
+        data = self.client.get("/api/words/", {"fields": "word", "shape": "columnar"}).json()
+        self.assertEqual(data, {"count": 3, "columns": {
+            "id": [w.id for w in self.words], "word": ["word0", "word1", "word2"],
+        }})
+
+    def test_pagination_is_opt_in(self):
+        self.assertEqual(len(self.client.get("/api/words/").json()), 3)
+        page = self.client.get("/api/words/", {"limit": 2, "offset": 2, "fields": "word"}).json()
+        self.assertEqual(page["count"], 3)
+        self.assertEqual(page["results"], [{"id": self.words[2].id, "word": "word2"}])
+
+    def test_catalog_version_readable_cross_origin(self):
+        response = self.client.get("/api/words/", HTTP_ORIGIN="http://localhost:3000")
+        self.assertTrue(response.has_header("X-Catalog-Version"))
+        self.assertIn("X-Catalog-Version", response["Access-Control-Expose-Headers"])
+
+    def test_delta_since_version(self):
+        response = self.client.get("/api/words/", {"fields": "word"})
+        version = int(response["X-Catalog-Version"])
+
+        changed = self.words[0]
+        changed.meaning = "new meaning"
+        changed.save()
+        gone_id = self.words[1].id
+        self.words[1].delete()
+        added = Word.objects.create(word="added", meaning="added meaning", group_number=1)
+
+        response = self.client.get("/api/words/", {"since": version, "fields": "word,meaning"})
+        data = response.json()
+        self.assertEqual(data["updated"], [
+            {"id": changed.id, "word": "word0", "meaning": "new meaning"},
+            {"id": added.id, "word": "added", "meaning": "added meaning"},
+        ])
+        self.assertEqual(data["deleted"], [gone_id])
+        self.assertEqual(data["version"], int(response["X-Catalog-Version"]))
+
+        caught_up = self.client.get("/api/words/", {"since": data["version"]}).json()
+        self.assertEqual((caught_up["updated"], caught_up["deleted"]), ([], []))
+
+    def test_delta_before_the_log_needs_a_full_fetch(self):
+        CatalogChange.objects.filter(version__lte=2).delete()  # Pruned
+        self.assertEqual(self.client.get("/api/words/", {"since": 0}).status_code, 410)
+
+    def test_rolled_up_stats_reach_delta_clients(self):
+        version = int(self.client.get("/api/words/")["X-Catalog-Version"])
+        WordStatShard.record(self.words[2].id, user_id=1, attempts=3, correct=2)
+        WordStatShard.rollup()
+        data = self.client.get("/api/words/", {"since": version,
+                                               "fields": "total_attempts,total_correct"}).json()
+        self.assertEqual(data["updated"], [
+            {"id": self.words[2].id, "total_attempts": 3, "total_correct": 2}
+        ])
+
+    def test_rollups_leave_the_content_version(self):
+        content = CatalogVersion.content()
+        WordStatShard.record(self.words[2].id, user_id=1)
+        WordStatShard.rollup()
+        self.assertEqual(CatalogVersion.content(), content)
+        self.words[2].save()
+        self.assertEqual(CatalogVersion.content(), content + 1)
+
+    def test_prune_drops_whole_old_versions(self):
+        version = int(self.client.get("/api/words/")["X-Catalog-Version"])
+        CatalogChange.objects.update(created_at=timezone.now() - timedelta(days=40))
+        self.words[0].save()  # A fresh version inside the window
+        call_command("prune_catalog_changes", stdout=io.StringIO())
+
+        self.assertEqual(set(CatalogChange.objects.values_list("word_id", flat=True)),
+                         {self.words[0].id})
+        self.assertEqual(self.client.get("/api/words/", {"since": version - 1}).status_code, 410)
+        self.assertEqual(self.client.get("/api/words/", {"since": version}).status_code, 200)
+
+    def test_prune_zero_days_keeps_nothing(self):
+        self.assertTrue(CatalogChange.objects.exists())
+        call_command("prune_catalog_changes", days=0, stdout=io.StringIO())
+        self.assertFalse(CatalogChange.objects.exists())
+        with self.assertRaises(CommandError):
+            call_command("prune_catalog_changes", days=-1, stdout=io.StringIO())
+
+
+# ============================================================================
+# SEARCH
+# ============================================================================
+
+class SearchTests(TestCase):
+    """FTS5 search stays in sync with the catalog; LIKE fallback agrees"""
+
+    def setUp(self):
+        self.user = User.objects.create(username="demo")
+        self.ephemeral = Word.objects.create(
+            word="ephemeral", meaning="lasting a very short time", group_number=1,
+            examples=[{"text": "Fame is <b>fleeting</b>."}]
+        )
+        self.brief = Word.objects.create(
+            word="brief", meaning="short in duration", group_number=1
+        )
+        UserWordProgress.objects.create(user=self.user, word=self.brief, mastery=4)
+
+    def search(self, q):
+        return self.client.get("/api/words/search/", {"q": q}).json()
+
+    def test_ranked_highlighted_with_mastery(self):
+        data = self.search("short")
+        self.assertEqual(data["backend"], "fts5")
+        by_word = {r["word"]: r for r in data["results"]}
+        self.assertEqual(set(by_word), {"ephemeral", "brief"})
+        self.assertEqual((by_word["brief"]["mastery"], by_word["brief"]["studied"]), (4, True))
+        self.assertIn("<mark>short</mark>", by_word["brief"]["highlight"]["snippet"])
+
+        # Prefix match on the word column ranks first; example HTML is escaped
+        self.assertEqual(self.search("ephem")["results"][0]["id"], self.ephemeral.id)
+        snippet = self.search("fleeting")["results"][0]["highlight"]["snippet"]
+        self.assertIn("&lt;b&gt;<mark>fleeting</mark>", snippet)
+
+    def test_index_follows_catalog_writes(self):
+        self.brief.meaning = "concise"
+        self.brief.save()
+        self.assertEqual([r["word"] for r in self.search("short")["results"]], ["ephemeral"])
+        self.ephemeral.delete()
+        self.assertEqual(self.search("short")["count"], 0)
+
+    def test_limit_is_clamped(self):
+        for backend in (True, False):
+            with mock.patch("vocab.search.fts_enabled", return_value=backend):
+                response = self.client.get("/api/words/search/", {"q": "short", "limit": -1})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()["count"], 1)
+        response = self.client.get("/api/words/search/", {"q": "short", "limit": "all"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_admin_keeps_substring_search(self):
+        self.client.force_login(User.objects.create_superuser("admin", "a@example.com", "pw"))
+        response = self.client.get("/admin/vocab/word/", {"q": "emer"})
+        self.assertContains(response, "ephemeral")
+
+    def test_like_fallback(self):
+        results = _search_like(self.user, "short", 20)
+        self.assertEqual({r["word"] for r in results}, {"ephemeral", "brief"})
+        self.assertEqual(_search_like(self.user, "brie", 20)[0]["highlight"]["word"],
+                         "<mark>brie</mark>f")
+
+    def test_like_fallback_searches_examples(self):
+        Word.objects.create(word="soupçon", meaning="a tiny amount", group_number=1,
+                            examples=[{"text": "Coffee at the café."}])
+        with mock.patch("vocab.search.fts_enabled", return_value=False):
+            data = self.search("fleeting")
+            self.assertEqual(data["backend"], "like")
+            self.assertEqual([r["word"] for r in data["results"]], ["ephemeral"])
+            self.assertIn("&lt;b&gt;<mark>fleeting</mark>",
+                          data["results"][0]["highlight"]["snippet"])
+            self.assertEqual([r["word"] for r in self.search("café")["results"]], ["soupçon"])
+            # JSON keys are not sentence text
+            self.assertEqual(self.search("text")["count"], 0)
+
+
+class AutocompleteTests(TestCase):
+    """Prefix completions first, one-typo matches after, rebuilt on writes"""
+
+    def setUp(self):
+        for word in ["Ephemeral", "ephemera", "epitome", "brief"]:
+            Word.objects.create(word=word, meaning="m", group_number=1)
+        autocomplete_index.invalidate()
+
+    def complete(self, q, **params):
+        data = self.client.get("/api/words/autocomplete/", {"q": q, **params}).json()
+        return [(r["word"], r["distance"]) for r in data["results"]]
+
+    def test_prefix_then_fuzzy(self):
+        self.assertEqual(self.complete("EPHEM"), [("ephemera", 0), ("Ephemeral", 0)])
+        # "ehpem" is a transposition away from "ephem"
+        self.assertEqual(self.complete("ehpem"), [("ephemera", 1), ("Ephemeral", 1)])
+        self.assertEqual(self.complete("ehpem", fuzzy="0"), [])
+        self.assertEqual(self.complete("ep", limit=1), [("ephemera", 0)])
+        self.assertEqual(self.complete("ehpem", limit=-5), [("ephemera", 1)])
+
+    def test_served_from_memory_and_follows_writes(self):
+        self.complete("ep")
+        with CaptureQueriesContext(connection) as queries:
+            self.complete("epi")
+        self.assertEqual(len(queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Word.objects.create(word="epic", meaning="m", group_number=2)
+        self.assertEqual(self.complete("epi", fuzzy="0"), [("epic", 0), ("epitome", 0)])
+
+
+class HotQueryIndexTests(TestCase):
+    """EXPLAIN QUERY PLAN: each hot filter is served by its own index"""
+
+    def setUp(self):
+        self.user = User.objects.create(username="demo")
+
+    def plan(self, queryset):
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return " | ".join(row[-1] for row in cursor.fetchall())
+
+    def test_due_reviews(self):
+        due = UserWordProgress.objects.filter(
+            user=self.user, due_date__lte=timezone.now(), marked_for_review=True
+        )
+        for queryset in (due.values_list("word_id", flat=True)[:20], due.values("id")):
+            self.assertIn("USING COVERING INDEX uwp_user_review_due_idx", self.plan(queryset))
+
+    def test_low_mastery(self):
+        low = UserWordProgress.objects.filter(user=self.user, mastery__lte=0)
+        self.assertIn("USING COVERING INDEX uwp_user_low_mastery_idx",
+                      self.plan(low.values_list("word_id", flat=True)[:20]))
+
+    def test_asked_words(self):
+        asked = QuizAttempt.objects.filter(session_id=1).values_list("word_id", flat=True)
+        self.assertIn("USING COVERING INDEX attempt_session_word_idx", self.plan(asked))
+
+
+class DueStreamTests(TestCase):
+    """NDJSON due queue: oldest first, keyset pages, same cards as legacy"""
+
+    def setUp(self):
+        self.user = User.objects.create(username="demo")
+        now = timezone.now()
+        self.words = make_words(5)
+        for i, word in enumerate(self.words):
+            # Four due (oldest = last word), one in the future
+            UserWordProgress.objects.create(
+                user=self.user, word=word, mastery=i, times_asked=2, times_correct=1,
+                due_date=now + timedelta(days=1 if i == 0 else -i), marked_for_review=True
+            )
+
+    def stream(self, **params):
+        response = self.client.get("/api/reviews/due/stream/", params)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+        return lines[:-1], lines[-1]
+
+    def test_cards_match_legacy_endpoint(self):
+        cards, trailer = self.stream()
+        self.assertEqual(trailer, {"next_cursor": None, "count": 4})
+        self.assertEqual([c["word_text"] for c in cards],
+                         [w.word for w in reversed(self.words[1:])])
+        legacy = {r["id"]: r for r in self.client.get("/api/reviews/due/").json()["results"]}
+        for card in cards:
+            self.assertEqual(card, legacy[card["id"]])
+
+    def test_keyset_pages(self):
+        seen, cursor = [], ""
+        while True:
+            cards, trailer = self.stream(limit=3, cursor=cursor)
+            seen += [c["id"] for c in cards]
+            cursor = trailer["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, [c["id"] for c in self.stream()[0]])
+        for params in ({"cursor": "x"}, {"limit": 0}, {"limit": -1}, {"limit": "ten"}):
+            response = self.client.get("/api/reviews/due/stream/", params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_count_uses_the_same_rule(self):
+        # Due but no longer marked (e.g. reset from the admin) still counts
+        UserWordProgress.objects.filter(word=self.words[1]).update(marked_for_review=False)
+        response = self.client.get("/api/reviews/due/count/")
+        self.assertEqual(response.json(), {"count": self.stream()[1]["count"]})
+        self.assertEqual(response.json()["count"], 4)
+        self.assertEqual(self.client.get("/api/reviews/due/count/",
+                                         HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+
+class ExportTests(TestCase):
+    """Streamed NDJSON / CSV exports over HTTP and the export_data command"""
+
+    def setUp(self):
+        self.user = User.objects.create(username="demo")
+        self.words = make_words(3)
+        self.words[0].examples = [{"text": "a, \"quoted\" example"}]
+        self.words[0].save()
+        UserWordProgress.objects.create(user=self.user, word=self.words[1], mastery=2)
+
+    def download(self, name):
+        response = self.client.get(f"/api/export/{name}")
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_and_csv_round_trip(self):
+        rows = [json.loads(line) for line in self.download("words.ndjson").splitlines()]
+        self.assertEqual([r["word"] for r in rows], ["word0", "word1", "word2"])
+        self.assertEqual(rows[0]["examples"], self.words[0].examples)
+
+        rows = list(csv.DictReader(io.StringIO(self.download("words.csv"))))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(json.loads(rows[0]["examples"]), self.words[0].examples)
+
+        progress = [json.loads(line) for line in self.download("progress.ndjson").splitlines()]
+        self.assertEqual([(p["word_id"], p["mastery"]) for p in progress], [(self.words[1].id, 2)])
+        self.assertEqual(self.download("attempts.csv").splitlines()[0].split(",")[:3],
+                         ["id", "session_id", "word_id"])
+        self.assertEqual(self.client.get("/api/export/users.csv").status_code, 404)
+
+    def test_command_matches_endpoint(self):
+        with tempfile.NamedTemporaryFile("r", suffix=".csv", newline="") as output:
+            call_command("export_data", "progress", "--format", "csv", "--user", "demo",
+                         "--output", output.name, stdout=io.StringIO())
+            self.assertEqual(output.read(), self.download("progress.csv"))
+
+    @override_settings(TIME_ZONE="Asia/Tokyo")
+    def test_filename_uses_the_local_date(self):
+        late_utc = timezone.now().replace(year=2030, month=1, day=1, hour=23)
+        with mock.patch("django.utils.timezone.now", return_value=late_utc):
+            response = self.client.get("/api/export/words.csv")
+        self.assertIn('filename="vocab-words-20300102.csv"', response["Content-Disposition"])
+
+
+class RendererTests(TestCase):
+    """Fast JSON matches DRF byte for byte; msgpack and gzip by Accept*"""
+
+    def setUp(self):
+        self.user = User.objects.create(username="demo")
+        self.words = make_words(30)
+
+    def test_fast_json_matches_drf(self):
+        data = {"when": timezone.now(), "text": "caf\u00e9 \u2028", 1: [None, True, 1.5],
+                "words": self.client.get("/api/words/").data}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_packb(self):
+        self.assertEqual(packb({"a": [1, -1, None, True, 1.5, "\u00e9", 300, -200]}),
+                         bytes.fromhex("81 a1 61 98 01 ff c0 c3 cb 3ff8000000000000"
+                                       " a2 c3a9 cd 012c d1 ff38"))
+        self.assertEqual(packb(["x" * 40, list(range(16))])[:4], bytes.fromhex("92 d9 28 78"))
+
+    def test_negotiation(self):
+        response = self.client.get("/api/words/", HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(response.content[:3], b"\xdc\x00\x1e")  # Array of 30 words
+
+        plain = self.client.get("/api/words/")
+        packed = self.client.get("/api/words/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(packed["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(packed.content), plain.content)
+
+    def test_live_streams_are_not_gzipped(self):
+        UserWordProgress.objects.create(user=self.user, word=self.words[0],
+                                        due_date=timezone.now())
+        stream = self.client.get("/api/reviews/due/stream/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(stream.has_header("Content-Encoding"))
+        self.assertEqual(len(b"".join(stream.streaming_content).splitlines()), 2)
+
+        export = self.client.get("/api/export/words.ndjson", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(export["Content-Encoding"], "gzip")
+
+    def test_conditional_get_through_gzip(self):
+        first = self.client.get("/api/quiz/dashboard/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertTrue(first["ETag"].startswith('W/"'))
+        again = self.client.get("/api/quiz/dashboard/", HTTP_ACCEPT_ENCODING="gzip",
+                                HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+
+class BulkImportTests(TestCase):
+    """add_words_bulk: same report, batched queries, one count for groups"""
+
+    def setUp(self):
+        make_words(29, prefix="old")  # One slot left in group 1
+
+    def post(self, items):
+        return self.client.post("/api/add-words/", items, content_type="application/json")
+
+    def test_report_and_group_numbers(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post([
+                {"word": "Alpha", "meaning": "first"},
+                {"meaning": "no word"},
+                {"word": "OLD3", "meaning": "taken"},
+                {"word": "alpha", "meaning": "repeat in batch"},
+                {"word": "Beta", "meaning": "second", "examples": "not a list"},
+                {"word": "Gamma", "meaning": "third"},
+                {"word": "Delta", "meaning": "fourth", "group_number": 7},
+            ])
+        self.assertEqual(response.status_code, 207)
+        data = response.json()
+        self.assertEqual(data["added"], ["Alpha", "Gamma", "Delta"])
+        self.assertEqual(
+            [(f["word"], f["reason"]) for f in data["failed"]],
+            [("(missing)", "Missing 'word' field"), ("OLD3", "Word already exists"),
+             ("alpha", "Word already exists"), ("Beta", "Invalid field(s)")]
+        )
+        groups = dict(Word.objects.filter(word__in=data["added"]).values_list("word", "group_number"))
+        self.assertEqual(groups, {"Alpha": 1, "Gamma": 2, "Delta": 7})
+        # Catalog log, search index and autocomplete see the new words
+        self.assertEqual(self.client.get("/api/words/search/", {"q": "gamma"}).json()["count"], 1)
+        added_ids = Word.objects.filter(word__in=data["added"]).values_list("id", flat=True)
+        self.assertEqual(CatalogChange.objects.filter(word_id__in=added_ids).count(), 3)
+
+        self.assertEqual(self.post({"word": "Epsilon", "meaning": "fifth"}).status_code, 201)
+
+    def test_non_ascii_case_is_not_folded(self):
+        # SQLite's LOWER() only folds ASCII letters, so word_key() does the
+        # same there: "ÉMIGRÉ" is a different word from "Émigré", matching
+        # what the Lower('word') index enforces
+        self.assertEqual(self.post({"word": "Émigré", "meaning": "m"}).status_code, 201)
+        response = self.post([{"word": "Émigré", "meaning": "m"}, {"word": "ÉMIGRÉ", "meaning": "m"}])
+        self.assertEqual(response.status_code, 207)
+        data = response.json()
+        self.assertEqual([f["reason"] for f in data["failed"]], ["Word already exists"])
+        self.assertEqual(data["added"], ["ÉMIGRÉ"])
+
+    def test_integrity_error_falls_back_to_per_item(self):
+        # Simulate a duplicate the batch lookup could not see
+        with mock.patch("vocab.views.existing_word_keys", return_value=set()):
+            response = self.post([{"word": "fresh", "meaning": "m"}, {"word": "old2", "meaning": "m"}])
+        self.assertEqual(response.status_code, 207)
+        data = response.json()
+        self.assertEqual(data["added"], ["fresh"])
+        self.assertEqual(data["failed"], [{"word": "old2", "reason": "Word already exists"}])
+        self.assertTrue(Word.objects.filter(word="fresh").exists())
+
+    def test_query_count_is_flat(self):
+        items = [{"word": f"new{i}", "meaning": "m"} for i in range(600)]
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.post(items).status_code, 201)
+        # Lookup chunks + count + INSERT batches (sized by the backend's
+        # parameter limit) + catalog bookkeeping - was 3+ queries per word
+        self.assertLess(len(queries), 30)
+        self.assertEqual(Word.objects.filter(word__startswith="new").count(), 600)
+
+    def test_lookup_uses_lower_index(self):
+        sql, params = (Word.objects.annotate(word_lower=Lower("word"))
+                       .filter(word_lower__in=["a", "b"]).values_list("word_lower").query
+                       .sql_with_params())
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            self.assertIn("word_lower_idx", " ".join(row[-1] for row in cursor.fetchall()))
+        self.assertEqual(existing_word_keys(["old1", "nope"]), {"old1"})
@@ -7,18 +7,38 @@ from django.contrib.auth.models import User
 from rest_framework import status, generics, permissions, viewsets
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import  F, FloatField,Count, Q, Avg, Sum, F,Count
-from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.utils.encoders import JSONEncoder
+from django.db.models import F, Count, Q
+from django.db.models import Case, When, Value, IntegerField, FilteredRelation
+from django.db.models import Subquery, OuterRef, Min
+from django.db.models.functions import Coalesce, Lower
+from django.db import connection, transaction, IntegrityError
+import base64
+import binascii
+import json
 import random
-from datetime import date, timedelta
-from django.db.models import FloatField, ExpressionWrapper
+from datetime import datetime
+from functools import wraps
+from django.utils.cache import parse_etags, quote_etag, patch_cache_control, patch_vary_headers
+from django.http import StreamingHttpResponse
 from .models import (
     Word, UserWordProgress, GroupProgress, QuizSession,
-    QuizAttempt, ReviewSession, UserStreak, MathQuestion
+    QuizAttempt, ReviewSession, UserStreak, MathQuestion, WordStatShard, UserStats,
+    CatalogVersion, CatalogChange
 )
 
+from .distractors import distractor_index
+from .neighbors import neighbor_index
+from .session_state import load_session, save_session, finish_session
+from .search import search_words
+from .autocomplete import autocomplete_index
+from .exports import DATASETS, FORMATS, export_lines
+from .signals import notify_catalog_change
 from .serializers import (
-    WordSerializer, UserWordProgressSerializer, GroupProgressSerializer,
+    WordSerializer, WordImportSerializer, UserWordProgressSerializer, GroupProgressSerializer,
     QuizSessionSerializer, QuizAttemptSerializer, ReviewSessionSerializer,
     UserStreakSerializer, MathQuestionSerializer, DashboardStatsSerializer,
     QuizReportSerializer, WordWithProgressSerializer
@@ -30,15 +50,77 @@ from .serializers import (
 
 GROUP_SIZE = 30
 
+# Hard distractors are drawn from this many most-confusable neighbors
+HARD_DISTRACTOR_POOL = 6
+
 def get_active_user(request):
     """Get authenticated user or fallback to demo user"""
     if request.user and request.user.is_authenticated:
         return request.user
-    user, _ = User.objects.get_or_create(username="demo")
+    # Resolved once per request - the ETag check and the view both ask
+    user = getattr(request, '_demo_user', None)
+    if user is None:
+        user, _ = User.objects.get_or_create(username="demo")
+        request._demo_user = user
     return user
 
+def progress_etag(user, daily=False):
+    """ETag over the user's progress version, the catalog content version and time
+
+    Due reviews also change as time passes, so the next due boundary is
+    part of the tag; once it has passed it is recounted (without saving).
+    daily=True adds today's date, for responses with day-based windows.
+    """
+    stats = UserStats.objects.filter(user=user).only(
+        'progress_version', 'next_due_at'
+    ).first()
+    version, next_due = 0, None
+    if stats:
+        version, next_due = stats.progress_version, stats.next_due_at
+    # No row yet (progress older than UserStats) or the boundary has passed
+    if stats is None or (next_due and timezone.now() >= next_due):
+        next_due = UserWordProgress.objects.filter(
+            user=user, due_date__gt=timezone.now()
+        ).aggregate(next_due=Min('due_date'))['next_due']
+    boundary = int(next_due.timestamp()) if next_due else 0
+    tag = f"{user.pk}-{version}-{CatalogVersion.content()}-{boundary}"
+    if daily:
+        tag += f"-{timezone.localdate():%Y%m%d}"
+    return quote_etag(tag)
+
+def conditional_on_progress(view=None, *, daily=False):
+    """Serve 304 Not Modified while progress_etag() is unchanged
+
+    Use @conditional_on_progress(daily=True) when the response also
+    depends on today's date.
+    """
+    if view is None:
+        return lambda view: conditional_on_progress(view, daily=daily)
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        etag = progress_etag(get_active_user(request), daily=daily)
+        # Weak comparison - GZipMiddleware hands out W/ versions of the tag
+        sent = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in {tag.removeprefix('W/') for tag in sent}:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = view(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            # Cached per user, and always revalidated
+            patch_cache_control(response, private=True, no_cache=True)
+            # Same tag for JSON and MessagePack bodies
+            patch_vary_headers(response, ['Accept'])
+        return response
+    return wrapped
+
 def build_adaptive_word_queue(user, quiz_type, group_number=None, word_ids=None):
-    """Build priority-based word queue for adaptive learning"""
+    """Build priority-based word queue for adaptive learning
+
+    Reference implementation of the ranking - adaptive_word_queryset
+    computes the same priorities in SQL and is what sessions use.
+    """
     # Base queryset
     if word_ids:
         # Specific word IDs (for due review, low mastery, etc.)
@@ -99,8 +181,75 @@ def build_adaptive_word_queue(user, quiz_type, group_number=None, word_ids=None)
     word_queue.sort(key=lambda x: x['priority'], reverse=True)
     return word_queue
 
+def adaptive_word_queryset(user, group_number=None, word_ids=None, exclude_ids=None):
+    """Same ranking as build_adaptive_word_queue, computed in one SQL query
+
+    Words are LEFT JOINed to the user's progress and annotated with
+    priority; slice the result to fetch only the top words.
+    """
+    if word_ids:
+        words = Word.objects.filter(id__in=word_ids)
+    elif group_number:
+        words = Word.objects.filter(group_number=group_number)
+    else:
+        words = Word.objects.all()
+
+    if exclude_ids:
+        words = words.exclude(id__in=exclude_ids)
+
+    now = timezone.now()
+    base_priority = Case(
+        When(progress__id__isnull=True, then=Value(1000)),  # Unstudied word
+        When(progress__mastery__lte=0, then=Value(500) - F('progress__mastery')),
+        When(progress__mastery__lte=2, then=Value(303) - F('progress__mastery')),
+        When(progress__mastery__lte=5, then=Value(106) - F('progress__mastery')),
+        default=Value(10),
+        output_field=IntegerField(),
+    )
+    due_boost = Case(
+        When(progress__due_date__lte=now, then=Value(200)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    # accuracy_rate < 50% with attempts  <=>  times_asked > 2 * times_correct
+    accuracy_boost = Case(
+        When(progress__times_asked__gt=F('progress__times_correct') * 2,
+             then=Value(100)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+    return words.annotate(
+        progress=FilteredRelation('user_progress', condition=Q(user_progress__user=user)),
+    ).annotate(
+        priority=base_priority + due_boost + accuracy_boost,
+        mastery=Coalesce('progress__mastery', Value(0)),
+    ).order_by('-priority', 'group_number', 'created_at', 'id')
+
+def build_question_plan(session, exclude_ids=()):
+    """Materialize the priority-ordered word IDs for a session (run once)"""
+    ranked = adaptive_word_queryset(
+        session.user,
+        group_number=session.group_number,
+        word_ids=session.word_ids,
+        exclude_ids=list(exclude_ids),
+    )
+    session.question_plan = list(ranked.values_list('id', flat=True))
+    session.plan_cursor = 0
+    return session.question_plan
+
+def ensure_question_plan(session):
+    """Build the plan once for sessions started before plans existed"""
+    if session.question_plan is None:
+        asked_word_ids = QuizAttempt.objects.filter(
+            session=session
+        ).values_list('word_id', flat=True)
+        build_question_plan(session, exclude_ids=asked_word_ids)
+        session.save(update_fields=['question_plan', 'plan_cursor'])
+    return session.question_plan
+
 def get_next_question_word(session):
-    """Get next word for quiz using retry queue + priority system"""
+    """Get next word for quiz using retry queue + precomputed plan"""
     # 1. FIRST PRIORITY: Retry queue
     if session.retry_queue:
         retry_word_id = session.retry_queue[0]  # Get first word in retry queue
@@ -109,51 +258,162 @@ def get_next_question_word(session):
         except Word.DoesNotExist:
             # Remove invalid word from retry queue
             session.retry_queue.remove(retry_word_id)
-            session.save()
-
-    # 2. SECOND PRIORITY: Build adaptive queue
-    asked_word_ids = set(
-        QuizAttempt.objects.filter(session=session)
-        .values_list('word_id', flat=True)
+            save_session(session)
+
+    # 2. SECOND PRIORITY: Precomputed plan
+    ensure_question_plan(session)
+
+    skipped = False
+    word = None
+    while word is None:
+        word_id = session.next_planned_word_id()
+        if word_id is None:
+            break
+        word = Word.objects.filter(id=word_id).first()
+        if word is None:
+            # Word deleted since the plan was built
+            session.advance_plan(word_id)
+            skipped = True
+
+    if skipped:
+        save_session(session)
+    return word  # None = no more questions
+
+def generate_quiz_options(correct_word):
+    """Generate 4 multiple choice options"""
+    # Sample from the in-memory indexes - no Word rows loaded
+    distractors = distractor_index.sample(
+        correct_word.id, correct_word.meaning.strip(), k=3,
+        preferred_ids=neighbor_index.get(correct_word.id)[:HARD_DISTRACTOR_POOL]
     )
 
-    # Get word queue based on session type
-    if session.word_ids:
-        # Specific word IDs
-        word_queue = build_adaptive_word_queue(
-            session.user, session.quiz_type, word_ids=session.word_ids
-        )
-    elif session.group_number:
-        # Group-based
-        word_queue = build_adaptive_word_queue(
-            session.user, session.quiz_type, group_number=session.group_number
-        )
-    else:
-        # All words
-        word_queue = build_adaptive_word_queue(session.user, session.quiz_type)
+    # Create options
+    options = [correct_word.meaning] + distractors
+    random.shuffle(options)
+    return options
 
-    # Find next unanswered word
-    for item in word_queue:
-        if item['word'].id not in asked_word_ids:
-            return item['word']
+def session_stats(session):
+    """Running score shown alongside each question"""
+    return {
+        'total_questions': session.total_questions,
+        'correct_answers': session.correct_answers,
+        'retry_queue_size': len(session.retry_queue),
+        'accuracy_rate': session.accuracy_rate
+    }
+
+def question_payload(word, is_retry, progress=None):
+    """Question body shared by the single and batched question endpoints"""
+    return {
+        'word_id': word.id,
+        'word': word.word,
+        'pronunciation': word.pronunciation,
+        'options': generate_quiz_options(word),
+        'is_retry': is_retry,
+        'current_mastery': progress.mastery if progress else 0,
+        'consecutive_correct': progress.consecutive_correct if progress else 0,
+    }
+
+def session_complete_payload(session, user):
+    """Response body once a session has no questions left"""
+    if session.group_number:
+        # Read the stored completion - answers keep it current
+        group_progress = GroupProgress.objects.filter(
+            user=user, group_number=session.group_number
+        ).first()
+        is_complete = bool(group_progress and group_progress.is_completed)
+        return {
+            'session_complete': True,
+            'group_completed': is_complete,
+            'message': 'Group completed!' if is_complete else 'No more questions for now.'
+        }
+    return {
+        'session_complete': True,
+        'message': 'Quiz completed!'
+    }
+
+def upcoming_word_ids(session, count, consecutive_by_word):
+    """Predict the next `count` question word IDs, assuming correct answers
+
+    Mirrors get_next_question_word: the retry queue head is asked until it
+    has enough consecutive correct answers, then the plan continues from
+    its cursor. A wrong answer changes the retry queue and voids the rest.
+    """
+    upcoming = []
+    for word_id in session.retry_queue:
+        required = session.retry_requirements.get(str(word_id), 2)
+        remaining = max(1, required - consecutive_by_word.get(word_id, 0))
+        upcoming.extend([word_id] * remaining)
+        if len(upcoming) >= count:
+            return upcoming[:count]
+
+    plan = session.question_plan or []
+    start = session.plan_cursor
+    upcoming.extend(plan[start:start + count - len(upcoming)])
+    return upcoming
+
+def apply_answer(session, word, progress, user_answer, time_taken=0):
+    """Score one answer against the in-memory session and progress
+
+    Runs your mastery and dual-correct retry rules and advances the plan,
+    but saves nothing: returns the unsaved QuizAttempt and an outcome dict.
+    """
+    is_correct = user_answer == word.meaning.strip()
 
-    return None  # No more questions
+    # Store before values
+    mastery_before = progress.mastery
+    consecutive_before = progress.consecutive_correct
 
-def generate_quiz_options(correct_word, all_words=None):
-    """Generate 4 multiple choice options"""
-    if not all_words:
-        all_words = list(Word.objects.exclude(id=correct_word.id))
+    # Update mastery using your system
+    progress.update_mastery(is_correct, save=False)
 
-    # Get 3 random distractors
-    distractors = random.sample(
-        [w for w in all_words if w.id != correct_word.id and w.meaning.strip()],
-        min(3, len(all_words) - 1)
+    # RETRY QUEUE LOGIC (Your dual-correct system)
+    removed_from_retry = False
+    added_to_retry = False
+
+    if is_correct:
+        # Check if can remove from retry queue (need 2 consecutive correct)
+        if word.id in session.retry_queue:
+            if session.check_retry_completion(word.id, progress.consecutive_correct, save=False):
+                removed_from_retry = True
+    else:
+        # Add to retry queue if not already there
+        if word.id not in session.retry_queue:
+            session.add_to_retry_queue(word.id, required_consecutive=2, save=False)
+            added_to_retry = True
+
+    attempt = QuizAttempt(
+        session=session,
+        word=word,
+        user_answer=user_answer,
+        correct_answer=word.meaning,
+        is_correct=is_correct,
+        is_retry_attempt=(word.id in session.retry_queue),
+        mastery_before=mastery_before,
+        mastery_after=progress.mastery,
+        consecutive_correct_before=consecutive_before,
+        consecutive_correct_after=progress.consecutive_correct,
+        time_taken_ms=time_taken,
+        question_order=session.total_questions + 1
     )
 
-    # Create options
-    options = [correct_word.meaning] + [w.meaning for w in distractors]
-    random.shuffle(options)
-    return options
+    # Move past this word in the question plan
+    session.advance_plan(word.id)
+
+    # Update session stats
+    session.total_questions += 1
+    if is_correct:
+        session.correct_answers += 1
+
+    # Check if word was mastered this session
+    if progress.mastery >= 6 and mastery_before < 6:
+        session.words_mastered_this_session += 1
+
+    return attempt, {
+        'is_correct': is_correct,
+        'mastery_before': mastery_before,
+        'added_to_retry': added_to_retry,
+        'removed_from_retry': removed_from_retry,
+    }
 
 # ============================================================================
 # NEW ADAPTIVE QUIZ SYSTEM - Your main system
@@ -161,6 +421,8 @@ def generate_quiz_options(correct_word, all_words=None):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+# recent_performance is a window of days ending today
+@conditional_on_progress(daily=True)
 def quiz_dashboard(request):
     """Comprehensive dashboard - your learning command center"""
     user = get_active_user(request)
@@ -175,69 +437,34 @@ def quiz_dashboard(request):
         user=user, is_completed=False
     ).order_by('group_number').first()
 
-    # MASTERY DISTRIBUTION (Your specific requirements)
-    mastery_stats = UserWordProgress.objects.filter(user=user).aggregate(
-        struggling=Count('id', filter=Q(mastery__lt=0)),  # Negative mastery
-        learning=Count('id', filter=Q(mastery__range=(0, 2))),  # 0-2
-        practicing=Count('id', filter=Q(mastery__range=(3, 5))),  # 3-5
-        mastered=Count('id', filter=Q(mastery__gte=6)),  # 6+
-        total_studied=Count('id')
-    )
+    # MASTERY, DUE AND RECENT COUNTERS - one maintained row
+    stats = UserStats.for_user(user)
+    mastery_stats = stats.mastery_distribution()
 
     # DUE REVIEWS (Spaced repetition)
-    due_words = UserWordProgress.objects.filter(
-        user=user,
-        due_date__lte=timezone.now(),
-        marked_for_review=True
-    )
-
-    due_count = due_words.count()
-    due_word_ids = list(due_words.values_list('word_id', flat=True)[:20])
+    due_count = stats.due_count
+    due_word_ids = []
+    if due_count > 0:
+        due_word_ids = list(UserWordProgress.objects.filter(
+            user=user,
+            due_date__lte=timezone.now(),
+            marked_for_review=True
+        ).values_list('word_id', flat=True)[:20])
 
     # LOW MASTERY WORDS (Your priority)
-    low_mastery_words = UserWordProgress.objects.filter(
-        user=user, mastery__lte=0
-    )
-
-    low_mastery_count = low_mastery_words.count()
-    low_mastery_word_ids = list(low_mastery_words.values_list('word_id', flat=True)[:20])
+    low_mastery_count = stats.low_mastery_count
+    low_mastery_word_ids = []
+    if low_mastery_count > 0:
+        low_mastery_word_ids = list(UserWordProgress.objects.filter(
+            user=user, mastery__lte=0
+        ).values_list('word_id', flat=True)[:20])
 
     # RECENT PERFORMANCE (Last 7 days)
-    week_ago = timezone.now() - timezone.timedelta(days=7)
-    # Method 1: Calculate average accuracy separately
-    completed_sessions = QuizSession.objects.filter(
-        user=user,
-        started_at__gte=week_ago,
-        completed_at__isnull=False
-    )
-
-    # Get basic aggregates first
-    recent_performance = completed_sessions.aggregate(
-        sessions_count=Count('id'),
-        total_questions=Sum('total_questions'),
-        total_correct=Sum('correct_answers'),
-        words_mastered=Sum('words_mastered_this_session')
-    )
-
-    # Calculate average accuracy separately
-    accuracy_data = completed_sessions.exclude(
-        total_questions=0
-    ).aggregate(
-        avg_accuracy=Avg(
-            ExpressionWrapper(
-                F('correct_answers') * 100.0 / F('total_questions'),
-                output_field=FloatField()
-            )
-        )
-    )
-
-    # Combine the results
-    recent_performance['avg_accuracy'] = accuracy_data.get('avg_accuracy', 0)
+    recent_performance = stats.recent_performance()
 
     # CURRENT GROUP DETAIL
     current_group_detail = None
     if current_group:
-        current_group.check_and_update_completion()  # Update stats
         current_group_detail = {
             'group_number': current_group.group_number,
             'words_total': current_group.words_total,
@@ -313,23 +540,26 @@ def start_adaptive_quiz(request):
     group_number = request.data.get('group_number')
     word_ids = request.data.get('word_ids', [])  # For due reviews, low mastery, etc.
 
-    # Create quiz session
-    session = QuizSession.objects.create(
+    # Create quiz session with its question plan
+    session = QuizSession(
         user=user,
         quiz_type=quiz_type,
         group_number=group_number,
         word_ids=word_ids
     )
+    plan = build_question_plan(session)
+    session.save()
+    UserStats.bump_version(user.pk)
 
     # Get preview stats
     if word_ids:
         word_count = len(word_ids)
         message = f"Starting {quiz_type} with {word_count} words"
     elif group_number:
-        word_count = Word.objects.filter(group_number=group_number).count()
+        word_count = len(plan)
         message = f"Starting Group {group_number} quiz ({word_count} words)"
     else:
-        word_count = Word.objects.count()
+        word_count = len(plan)
         message = f"Starting adaptive quiz ({word_count} words available)"
 
     return Response({
@@ -346,74 +576,99 @@ def get_adaptive_question(request, session_id):
     """Get next question with your retry queue system"""
     user = get_active_user(request)
     try:
-        session = QuizSession.objects.get(id=session_id, user=user)
+        session = load_session(session_id, user)
     except QuizSession.DoesNotExist:
         return Response({'error': 'Session not found'}, status=404)
 
     # Check if session should end
     current_word = get_next_question_word(session)
     if not current_word:
-        # Check if retry queue is empty and group is complete
-        if not session.retry_queue:
-            if session.group_number:
-                # Check group completion
-                group_progress, _ = GroupProgress.objects.get_or_create(
-                    user=user,
-                    group_number=session.group_number,
-                    defaults={'mastery_threshold': 3}
-                )
-
-                is_complete = group_progress.check_and_update_completion()
-                return Response({
-                    'session_complete': True,
-                    'group_completed': is_complete,
-                    'message': 'Group completed!' if is_complete else 'No more questions for now.'
-                })
-            else:
-                return Response({
-                    'session_complete': True,
-                    'message': 'Quiz completed!'
-                })
-
-    # Generate question options
-    all_words = list(Word.objects.all())  # Cache for option generation
-    options = generate_quiz_options(current_word, all_words)
+        return Response(session_complete_payload(session, user))
 
     # Check if this is a retry question
     is_retry = current_word.id in session.retry_queue
 
     # Get user progress for context
+    progress = UserWordProgress.objects.filter(user=user, word=current_word).first()
+
+    payload = question_payload(current_word, is_retry, progress)
+    payload['session_stats'] = session_stats(session)
+    return Response(payload)
+
+MAX_PREFETCH_QUESTIONS = 50
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def get_adaptive_questions(request, session_id):
+    """Prefetch the next N questions in one round trip
+
+    Order follows the retry queue rules assuming each answer is correct;
+    after a wrong answer the client should fetch a fresh batch.
+    """
+    user = get_active_user(request)
     try:
-        progress = UserWordProgress.objects.get(user=user, word=current_word)
-        current_mastery = progress.mastery
-        consecutive_correct = progress.consecutive_correct
-    except UserWordProgress.DoesNotExist:
-        current_mastery = 0
-        consecutive_correct = 0
+        session = load_session(session_id, user)
+    except QuizSession.DoesNotExist:
+        return Response({'error': 'Session not found'}, status=404)
+
+    try:
+        count = int(request.GET.get('n', 10))
+    except ValueError:
+        return Response({'error': 'n must be an integer'}, status=400)
+    count = max(1, min(count, MAX_PREFETCH_QUESTIONS))
+
+    plan = ensure_question_plan(session)
+    window = set(session.retry_queue) | set(plan[session.plan_cursor:session.plan_cursor + count])
+    words = Word.objects.in_bulk(list(window))
+    progress_by_word = {
+        p.word_id: p for p in UserWordProgress.objects.filter(user=user, word_id__in=list(window))
+    }
+
+    # Drop words deleted since the queue/plan was built
+    missing = window - set(words)
+    if missing:
+        session.retry_queue = [wid for wid in session.retry_queue if wid not in missing]
+        session.question_plan = (
+            plan[:session.plan_cursor]
+            + [wid for wid in plan[session.plan_cursor:] if wid not in missing]
+        )
+        save_session(session)
+
+    consecutive_by_word = {
+        word_id: p.consecutive_correct for word_id, p in progress_by_word.items()
+    }
+    upcoming = [
+        wid for wid in upcoming_word_ids(session, count, consecutive_by_word)
+        if wid in words
+    ]
+
+    if not upcoming:
+        return Response(session_complete_payload(session, user))
+
+    retry_ids = set(session.retry_queue)
+    questions = [
+        question_payload(words[wid], wid in retry_ids, progress_by_word.get(wid))
+        for wid in upcoming
+    ]
+    plan_remaining = len(session.question_plan) - session.plan_cursor
 
     return Response({
-        'word_id': current_word.id,
-        'word': current_word.word,
-        'pronunciation': current_word.pronunciation,
-        'options': options,
-        'is_retry': is_retry,
-        'current_mastery': current_mastery,
-        'consecutive_correct': consecutive_correct,
-        'session_stats': {
-            'total_questions': session.total_questions,
-            'correct_answers': session.correct_answers,
-            'retry_queue_size': len(session.retry_queue),
-            'accuracy_rate': session.accuracy_rate
-        }
+        'questions': questions,
+        'session_complete': False,
+        'has_more': plan_remaining > sum(1 for wid in upcoming if wid not in retry_ids),
+        'session_stats': session_stats(session)
     })
 
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 def submit_adaptive_answer(request, session_id):
-    """Submit answer with your dual-correct retry system"""
+    """Submit answer with your dual-correct retry system
+
+    Pass include_next to also receive the following question.
+    """
     user = get_active_user(request)
     try:
-        session = QuizSession.objects.get(id=session_id, user=user)
+        session = load_session(session_id, user)
     except QuizSession.DoesNotExist:
         return Response({'error': 'Session not found'}, status=404)
 
@@ -422,93 +677,51 @@ def submit_adaptive_answer(request, session_id):
     time_taken = request.data.get('time_taken', 0)
 
     try:
-        word = Word.objects.get(id=word_id)
+        # Only the columns the answer path reads - skip the other JSON fields
+        word = Word.objects.only('id', 'meaning', 'examples', 'group_number').get(id=word_id)
     except Word.DoesNotExist:
         return Response({'error': 'Word not found'}, status=404)
 
-    is_correct = user_answer == word.meaning.strip()
-
     with transaction.atomic():
-        # Get or create progress
-        progress, created = UserWordProgress.objects.get_or_create(
-            user=user,
-            word=word,
-            defaults={'mastery': 0}
-        )
-
-        # Store before values
-        mastery_before = progress.mastery
-        consecutive_before = progress.consecutive_correct
-
-        # Update mastery using your system
-        progress.update_mastery(is_correct)
-
-        # RETRY QUEUE LOGIC (Your dual-correct system)
-        removed_from_retry = False
-        added_to_retry = False
-
-        if is_correct:
-            # Check if can remove from retry queue (need 2 consecutive correct)
-            if word_id in session.retry_queue:
-                if session.check_retry_completion(word_id, progress.consecutive_correct):
-                    removed_from_retry = True
+        # Existing progress is updated in place, new progress inserted once
+        progress = UserWordProgress.objects.filter(user=user, word=word).first()
+        if progress is None:
+            progress = UserWordProgress(user=user, word=word, mastery=0)
+        before = progress.snapshot() if progress.pk else None
+
+        # Score the answer, update mastery and the retry queue in memory
+        attempt, outcome = apply_answer(session, word, progress, user_answer, time_taken)
+        if progress.pk:
+            progress.save(update_fields=UserWordProgress.ANSWER_FIELDS)
         else:
-            # Add to retry queue if not already there
-            if word_id not in session.retry_queue:
-                session.add_to_retry_queue(word_id, required_consecutive=2)
-                added_to_retry = True
-
-        # Update global word stats
-        word.total_attempts += 1
-        if is_correct:
-            word.total_correct += 1
-        word.save()
-
-        # Record attempt
-        attempt = QuizAttempt.objects.create(
-            session=session,
-            word=word,
-            user_answer=user_answer,
-            correct_answer=word.meaning,
-            is_correct=is_correct,
-            is_retry_attempt=(word_id in session.retry_queue),
-            mastery_before=mastery_before,
-            mastery_after=progress.mastery,
-            consecutive_correct_before=consecutive_before,
-            consecutive_correct_after=progress.consecutive_correct,
-            time_taken_ms=time_taken,
-            question_order=session.total_questions + 1
-        )
+            progress.save()
+        UserStats.record_progress_changes(user.pk, [(before, progress.snapshot())])
+        GroupProgress.record_changes(user.pk, word.group_number, [
+            (before[0] if before else None, progress.mastery)
+        ])
 
-        # Update session stats
-        session.total_questions += 1
-        if is_correct:
-            session.correct_answers += 1
+        # Update global word stats on a shard, not the shared Word row
+        WordStatShard.record(word.pk, user.pk, correct=int(outcome['is_correct']))
 
-        # Check if word was mastered this session
-        if progress.mastery >= 6 and mastery_before < 6:
-            session.words_mastered_this_session += 1
+        # Record attempt; the session is cached and flushed periodically
+        attempt.save()
+        save_session(session)
 
-        session.save()
+        # Update user streak (writes at most once a day)
+        streak, _ = UserStreak.objects.get_or_create(user=user)
+        streak.update_streak()
 
-        # Update user streak
-        try:
-            streak = UserStreak.objects.get(user=user)
-            streak.update_streak()
-        except UserStreak.DoesNotExist:
-            UserStreak.objects.create(user=user).update_streak()
-
-    return Response({
-        'is_correct': is_correct,
+    response = {
+        'is_correct': outcome['is_correct'],
         'correct_answer': word.meaning,
-        'mastery_before': mastery_before,
+        'mastery_before': outcome['mastery_before'],
         'mastery_after': progress.mastery,
         'consecutive_correct': progress.consecutive_correct,
         'explanation': word.examples[0]['text'] if word.examples else None,
         'retry_status': {
-            'added_to_retry': added_to_retry,
-            'removed_from_retry': removed_from_retry,
-            'in_retry_queue': word_id in session.retry_queue,
+            'added_to_retry': outcome['added_to_retry'],
+            'removed_from_retry': outcome['removed_from_retry'],
+            'in_retry_queue': word.id in session.retry_queue,
             'retry_queue_size': len(session.retry_queue)
         },
         'session_progress': {
@@ -517,6 +730,154 @@ def submit_adaptive_answer(request, session_id):
             'accuracy_rate': session.accuracy_rate,
             'words_mastered': session.words_mastered_this_session
         }
+    }
+
+    # Optionally piggyback the next question to save a round trip
+    if wants_next_question(request):
+        response['next_question'] = next_question_payload(session, user, word, progress)
+
+    return Response(response)
+
+def wants_next_question(request):
+    """True when the client asked for ?include_next=1 or {"include_next": true}"""
+    flag = request.query_params.get('include_next', request.data.get('include_next'))
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+def next_question_payload(session, user, last_word, last_progress):
+    """Next question from the in-memory session, reusing the last word's progress"""
+    next_word = get_next_question_word(session)
+    if not next_word:
+        return session_complete_payload(session, user)
+
+    if next_word.id == last_word.id:
+        progress = last_progress
+    else:
+        progress = UserWordProgress.objects.filter(user=user, word=next_word).first()
+
+    payload = question_payload(next_word, next_word.id in session.retry_queue, progress)
+    payload['session_stats'] = session_stats(session)
+    return payload
+
+MAX_SYNC_ANSWERS = 500
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def sync_adaptive_answers(request, session_id):
+    """Replay an ordered batch of answers queued offline by the client
+
+    Body: {"answers": [{"word_id", "answer", "time_taken"}, ...],
+           "base_total_questions": optional count the client last saw}
+    Every answer goes through the same rules as submit_adaptive_answer,
+    inside one transaction with bulk inserts/updates.
+    """
+    user = get_active_user(request)
+    answers = request.data.get('answers')
+    if not isinstance(answers, list) or not answers:
+        return Response({'error': 'answers must be a non-empty list'}, status=400)
+    if len(answers) > MAX_SYNC_ANSWERS:
+        return Response({'error': f'At most {MAX_SYNC_ANSWERS} answers per sync'}, status=400)
+
+    try:
+        word_ids = [int(item.get('word_id')) for item in answers]
+    except (AttributeError, TypeError, ValueError):
+        return Response({'error': 'Every answer needs an integer word_id'}, status=400)
+
+    with transaction.atomic():
+        try:
+            session = load_session(
+                session_id, user, queryset=QuizSession.objects.select_for_update()
+            )
+        except QuizSession.DoesNotExist:
+            return Response({'error': 'Session not found'}, status=404)
+
+        # Refuse a batch the server has already applied (e.g. a resend)
+        base = request.data.get('base_total_questions')
+        if base is not None and base != session.total_questions:
+            return Response({
+                'error': 'Session has moved on since this batch was queued',
+                'total_questions': session.total_questions
+            }, status=409)
+
+        words = Word.objects.in_bulk(set(word_ids))
+        progress_by_word = {
+            p.word_id: p
+            for p in UserWordProgress.objects.filter(user=user, word_id__in=list(words))
+        }
+        before = {word_id: p.snapshot() for word_id, p in progress_by_word.items()}
+        new_progress = {}
+        attempts = []
+        stat_deltas = {}  # word_id -> [attempts, correct]
+        results = []
+
+        for item, word_id in zip(answers, word_ids):
+            word = words.get(word_id)
+            if word is None:
+                results.append({'word_id': word_id, 'error': 'Word not found'})
+                continue
+
+            progress = progress_by_word.get(word_id)
+            if progress is None:
+                progress = UserWordProgress(user=user, word=word, mastery=0)
+                progress_by_word[word_id] = new_progress[word_id] = progress
+
+            attempt, outcome = apply_answer(
+                session, word, progress,
+                (item.get('answer') or '').strip(), item.get('time_taken', 0)
+            )
+            attempts.append(attempt)
+
+            delta = stat_deltas.setdefault(word_id, [0, 0])
+            delta[0] += 1
+            delta[1] += int(outcome['is_correct'])
+
+            results.append({
+                'word_id': word_id,
+                'is_correct': outcome['is_correct'],
+                'mastery_before': outcome['mastery_before'],
+                'mastery_after': progress.mastery,
+                'added_to_retry': outcome['added_to_retry'],
+                'removed_from_retry': outcome['removed_from_retry'],
+            })
+
+        # Persist everything with a fixed number of statements
+        now = timezone.now()
+        existing = [p for wid, p in progress_by_word.items() if wid not in new_progress]
+        for progress in existing:
+            progress.last_practiced = now  # auto_now is skipped by bulk_update
+        UserWordProgress.objects.bulk_update(existing, UserWordProgress.ANSWER_FIELDS)
+        UserWordProgress.objects.bulk_create(new_progress.values())
+        QuizAttempt.objects.bulk_create(attempts)
+
+        WordStatShard.record_many(stat_deltas, user.pk)
+        UserStats.record_progress_changes(user.pk, [
+            (before.get(word_id), progress.snapshot())
+            for word_id, progress in progress_by_word.items()
+        ])
+        group_changes = {}
+        for word_id, progress in progress_by_word.items():
+            mastery_before = before[word_id][0] if word_id in before else None
+            group_changes.setdefault(words[word_id].group_number, []).append(
+                (mastery_before, progress.mastery)
+            )
+        for group_number, changes in group_changes.items():
+            GroupProgress.record_changes(user.pk, group_number, changes)
+
+        save_session(session, flush=True)
+
+        if attempts:
+            streak, _ = UserStreak.objects.get_or_create(user=user)
+            streak.update_streak()
+
+    return Response({
+        'results': results,
+        'applied': len(attempts),
+        'retry_queue_size': len(session.retry_queue),
+        'session_progress': {
+            'total_questions': session.total_questions,
+            'correct_answers': session.correct_answers,
+            'accuracy_rate': session.accuracy_rate,
+            'words_mastered': session.words_mastered_this_session
+        }
     })
 
 @api_view(['POST'])
@@ -524,15 +885,19 @@ def submit_adaptive_answer(request, session_id):
 def complete_adaptive_quiz_session(request, session_id):
     """Complete quiz session and generate comprehensive report"""
     user = get_active_user(request)
-    try:
-        session = QuizSession.objects.get(id=session_id, user=user)
-    except QuizSession.DoesNotExist:
-        return Response({'error': 'Session not found'}, status=404)
-
     with transaction.atomic():
-        session.completed_at = timezone.now()
-        session.is_active = False
-        session.save()
+        try:
+            session = load_session(
+                session_id, user, queryset=QuizSession.objects.select_for_update()
+            )
+        except QuizSession.DoesNotExist:
+            return Response({'error': 'Session not found'}, status=404)
+
+        # A repeated /complete/ gets the report again but records nothing
+        newly_completed = session.completed_at is None
+        if newly_completed:
+            session.completed_at = timezone.now()
+            session.is_active = False
 
         # Get all attempts for detailed report
         attempts = QuizAttempt.objects.filter(session=session).select_related('word')
@@ -559,7 +924,11 @@ def complete_adaptive_quiz_session(request, session_id):
 
             group_completed = group_progress.check_and_update_completion()
             session.group_completed = group_completed
-            session.save()
+
+        # Persist the final state and drop the cached copy
+        if newly_completed:
+            finish_session(session)
+            UserStats.record_session(session)
 
         # Performance summary
         performance = {
@@ -588,12 +957,10 @@ def generate_next_recommendations(user, completed_session):
     """Generate what user should do next"""
     recommendations = []
 
+    stats = UserStats.for_user(user)
+
     # Check for due reviews
-    due_count = UserWordProgress.objects.filter(
-        user=user,
-        due_date__lte=timezone.now(),
-        marked_for_review=True
-    ).count()
+    due_count = stats.due_count
 
     if due_count > 0:
         recommendations.append({
@@ -603,9 +970,7 @@ def generate_next_recommendations(user, completed_session):
         })
 
     # Check for low mastery words
-    low_mastery_count = UserWordProgress.objects.filter(
-        user=user, mastery__lte=0
-    ).count()
+    low_mastery_count = stats.low_mastery_count
 
     if low_mastery_count > 0:
         recommendations.append({
@@ -656,13 +1021,8 @@ def mark_word_read(request):
 
     # Update group progress if this is first time seeing word
     if created:
-        group_progress, _ = GroupProgress.objects.get_or_create(
-            user=user,
-            group_number=word.group_number,
-            defaults={'mastery_threshold': 3}
-        )
-
-        group_progress.check_and_update_completion()
+        UserStats.record_progress_changes(user.pk, [(None, progress.snapshot())])
+        GroupProgress.record_changes(user.pk, word.group_number, [(None, progress.mastery)])
 
     return Response({
         'word_id': word.id,
@@ -671,11 +1031,82 @@ def mark_word_read(request):
         'first_seen': created
     })
 
+# Word columns returned by get_words_by_criteria, in response order
+CRITERIA_WORD_FIELDS = [
+    'id', 'word', 'pronunciation', 'meaning', 'story_mnemonic', 'group_number',
+    'examples', 'word_breakdown', 'synonyms', 'antonyms', 'tags',
+    'external_links', 'etymology',
+]
+# Per-user columns computed from the joined progress row
+CRITERIA_PROGRESS_FIELDS = ['mastery', 'is_due', 'times_asked', 'times_correct', 'accuracy_rate']
+
+def requested_fields(request, available):
+    """Fields named in ?fields=a,b (plus id), in `available` order
+
+    Returns all of `available` when the parameter is absent; unknown names
+    are a 400.
+    """
+    raw = request.query_params.get('fields')
+    if not raw:
+        return list(available)
+    wanted = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = wanted - set(available)
+    if unknown:
+        raise ValidationError({'fields': f"Unknown field(s): {', '.join(sorted(unknown))}"})
+    return [name for name in available if name in wanted or name == 'id']
+
+def wants_columnar(request):
+    """True for ?shape=columnar; ?shape=records (default) keeps row objects"""
+    shape = request.query_params.get('shape', 'records')
+    if shape not in ('records', 'columnar'):
+        raise ValidationError({'shape': "Use 'records' or 'columnar'"})
+    return shape == 'columnar'
+
+def to_columns(rows, fields):
+    """Row dicts as parallel arrays, one per field - keys sent once"""
+    return {field: [row[field] for row in rows] for field in fields}
+
+# Keyset sort orders - (field, parser for the value read back from a cursor)
+WORD_CURSOR_KEY = [('group_number', int), ('created_at', datetime.fromisoformat), ('id', int)]
+DUE_CURSOR_KEY = [('due_date', datetime.fromisoformat), ('id', int)]
+
+def encode_cursor(row, key=WORD_CURSOR_KEY):
+    """Opaque keyset cursor holding row's values for the key fields"""
+    values = [row[field] for field, _ in key]
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(token, key=WORD_CURSOR_KEY):
+    """Tuple of key values from encode_cursor - ValueError if bad"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token))
+        if not isinstance(values, list) or len(values) != len(key):
+            raise ValueError('Wrong cursor length')
+        return tuple(parse(value) for (_, parse), value in zip(key, values))
+    except (TypeError, ValueError, binascii.Error) as exc:
+        raise ValueError('Invalid cursor') from exc
+
+def after_cursor(rows, cursor, key=WORD_CURSOR_KEY):
+    """Rows strictly after cursor in key order"""
+    fields = [field for field, _ in key]
+    condition = Q()
+    for n, field in enumerate(fields):
+        condition |= Q(**dict(zip(fields[:n], cursor)), **{f'{field}__gt': cursor[n]})
+    return rows.filter(condition)
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def get_words_by_criteria(request):
-    """Get words by various criteria - FIXED PAGINATION"""
+    """Get words by various criteria with the user's progress joined in
+
+    Pass ?cursor= (empty for the first page, then next_cursor) for keyset
+    pagination; offset/limit still work but deep offsets get slower.
+    ?fields= picks columns and ?shape=columnar returns parallel arrays.
+    """
     user = get_active_user(request)
+    fields = requested_fields(request, CRITERIA_WORD_FIELDS + CRITERIA_PROGRESS_FIELDS)
+    word_fields = [f for f in CRITERIA_WORD_FIELDS if f in fields]
+    progress_fields = [f for f in CRITERIA_PROGRESS_FIELDS if f in fields]
 
     # Query parameters
     group_number = request.GET.get('group')
@@ -683,8 +1114,14 @@ def get_words_by_criteria(request):
     mastery_min = request.GET.get('mastery_min')
     due_for_review = request.GET.get('due_for_review')
     word_ids = request.GET.get('word_ids')  # Comma-separated
-    limit = int(request.GET.get('limit', 30))  # Default to 30
+    try:
+        limit = int(request.GET.get('limit', 30))  # Default to 30
+        if limit < 1:
+            raise ValueError('limit must be positive')
+    except ValueError:
+        return Response({'error': 'limit must be a positive integer'}, status=400)
     offset = int(request.GET.get('offset', 0))  # Add offset support
+    cursor = request.GET.get('cursor')
 
     # STEP 1: Start with base queryset
     if word_ids:
@@ -696,77 +1133,78 @@ def get_words_by_criteria(request):
     else:
         words = Word.objects.all()
 
-    # STEP 2: Get user progress for these words
-    progress_map = {}
-    progress_qs = UserWordProgress.objects.filter(
-        user=user, word__in=words
-    ).select_related('word')
-
-    # Apply mastery filters
+    # STEP 2: LEFT JOIN the user's progress; progress filters make it inner
+    words = words.annotate(
+        progress=FilteredRelation('user_progress', condition=Q(user_progress__user=user)),
+    )
     if mastery_max is not None:
-        progress_qs = progress_qs.filter(mastery__lte=int(mastery_max))
+        words = words.filter(progress__mastery__lte=int(mastery_max))
     if mastery_min is not None:
-        progress_qs = progress_qs.filter(mastery__gte=int(mastery_min))
+        words = words.filter(progress__mastery__gte=int(mastery_min))
     if due_for_review == 'true':
-        progress_qs = progress_qs.filter(
-            due_date__lte=timezone.now(),
-            marked_for_review=True
+        words = words.filter(
+            progress__due_date__lte=timezone.now(),
+            progress__marked_for_review=True
         )
+    words = words.order_by('group_number', 'created_at', 'id')
+
+    # STEP 3: Page by keyset cursor, or count and offset for old clients
+    if cursor is not None:
+        if cursor:
+            try:
+                words = after_cursor(words, decode_cursor(cursor))
+            except ValueError:
+                return Response({'error': 'Invalid cursor'}, status=400)
+        total_available = None
+        page = words
+    else:
+        total_available = words.count()
+        page = words[offset:]
+
+    # Only the requested columns leave the database (plus the cursor key)
+    progress_columns = {}
+    if progress_fields:
+        progress_columns = {
+            'p_mastery': F('progress__mastery'),
+            'p_times_asked': F('progress__times_asked'),
+            'p_times_correct': F('progress__times_correct'),
+            'p_due_date': F('progress__due_date'),
+        }
+    key_fields = [f for f in ('id', 'group_number', 'created_at') if f not in word_fields]
+    rows = list(page.values(*word_fields, *key_fields, **progress_columns)[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
-    for progress in progress_qs:
-        progress_map[progress.word_id] = progress
-
-    # STEP 3: If filtering by mastery/due date, only include words with progress
-    if mastery_max is not None or mastery_min is not None or due_for_review == 'true':
-        words = words.filter(id__in=progress_map.keys())
-
-    # STEP 4: Count total BEFORE applying pagination
-    total_available = words.count()
-
-    # STEP 5: Apply pagination
-    words = words[offset:offset + limit]
-
-    # STEP 6: Build response
+    # STEP 4: Build response
+    now = timezone.now()
     result = []
-    for word in words:
-        progress = progress_map.get(word.id)
-        result.append({
-            'id': word.id,
-            'word': word.word,
-            'pronunciation': word.pronunciation,
-            'meaning': word.meaning,
-            "story_mnemonic": word.story_mnemonic,
-            'group_number': word.group_number,
-            'examples': word.examples,
-            "word_breakdown": word.word_breakdown,
-            'mastery': progress.mastery if progress else 0,
-            'is_due': progress.is_due_for_review() if progress else False,
-            'times_asked': progress.times_asked if progress else 0,
-            'times_correct': progress.times_correct if progress else 0,
-            'accuracy_rate': progress.accuracy_rate if progress else 0,
-            "synonyms": word.synonyms,
-            "antonyms": word.antonyms,
-            "tags": word.tags,
-            "external_links":word.external_links,
-            "etymology": word.etymology,
-               
-        
-        
-        
-        
-        
-        
-        })
+    for row in rows:
+        item = {field: row[field] for field in word_fields}
+        if progress_fields:
+            times_asked = row['p_times_asked'] or 0
+            times_correct = row['p_times_correct'] or 0
+            progress = {
+                'mastery': row['p_mastery'] or 0,
+                'is_due': bool(row['p_due_date'] and now >= row['p_due_date']),
+                'times_asked': times_asked,
+                'times_correct': times_correct,
+                'accuracy_rate': (times_correct / times_asked) * 100 if times_asked else 0,
+            }
+            item.update((field, progress[field]) for field in progress_fields)
+        result.append(item)
+
+    pagination = {
+        'limit': limit,
+        'returned': len(result),
+        'has_more': has_more,
+        'next_cursor': encode_cursor(rows[-1]) if has_more else None,
+    }
+    if cursor is None:
+        pagination.update({'offset': offset, 'total_available': total_available})
 
     return Response({
-        'words': result,
-        'pagination': {
-            'limit': limit,
-            'offset': offset,
-            'returned': len(result),
-            'total_available': total_available,
-            'has_more': (offset + limit) < total_available
-        },
+        'words': to_columns(result, fields) if wants_columnar(request) else result,
+        'pagination': pagination,
         'criteria': {
             'group_number': group_number,
             'mastery_max': mastery_max,
@@ -776,39 +1214,111 @@ def get_words_by_criteria(request):
         }
     })
 
+MAX_SEARCH_RESULTS = 100
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def search_catalog(request):
+    """Full-text word search: ?q=...&limit=20
+
+    Results are ranked, carry <mark>-highlighted word and snippet text and
+    the user's mastery for each word.
+    """
+    user = get_active_user(request)
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = int(request.GET.get('limit', 20))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=400)
+    # SQLite reads LIMIT -1 as "no limit"
+    limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+    if not query:
+        return Response({'error': 'q required'}, status=400)
+
+    results, backend = search_words(user, query, limit)
+    return Response({
+        'query': query,
+        'backend': backend,
+        'count': len(results),
+        'results': results,
+    })
+
+MAX_AUTOCOMPLETE_RESULTS = 50
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def autocomplete_words(request):
+    """Word completions as you type: ?q=eph&limit=10&fuzzy=1
+
+    Served from the in-memory prefix index; with fuzzy on (default), words
+    one typo away fill up short result lists.
+    """
+    query = request.GET.get('q', '')
+    try:
+        limit = int(request.GET.get('limit', 10))
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=400)
+    limit = max(1, min(limit, MAX_AUTOCOMPLETE_RESULTS))
+    fuzzy = request.GET.get('fuzzy', '1').lower() not in ('0', 'false', 'no')
+
+    results = autocomplete_index.complete(query, limit=limit, fuzzy=fuzzy)
+    return Response({'query': query, 'results': results})
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def groups_with_progress(request):
-    """Get all groups with detailed progress info"""
+    """Get all groups with detailed progress info
+
+    One grouped aggregate over Word LEFT JOIN the user's progress, plus
+    one read of GroupProgress; missing rows are created in one INSERT.
+    """
     user = get_active_user(request)
 
-    # Get all groups
-    groups = Word.objects.values('group_number').annotate(
-        total_words=Count('id')
+    # Per-group threshold, falling back to the default for new groups
+    threshold = Coalesce(
+        Subquery(GroupProgress.objects.filter(
+            user=user, group_number=OuterRef('group_number')
+        ).values('mastery_threshold')[:1]),
+        Value(3),
+    )
+    groups = Word.objects.annotate(
+        progress=FilteredRelation('user_progress', condition=Q(user_progress__user=user)),
+    ).values('group_number').annotate(
+        total_words=Count('id'),
+        words_started=Count('progress'),
+        words_mastered=Count('progress', filter=Q(progress__mastery__gte=threshold)),
     ).order_by('group_number')
 
-    result = []
-    for group in groups:
-        group_num = group['group_number']
+    progress_by_group = {
+        gp.group_number: gp for gp in GroupProgress.objects.filter(user=user)
+    }
 
-        # Get or create group progress
-        group_progress, _ = GroupProgress.objects.get_or_create(
-            user=user,
-            group_number=group_num,
-            defaults={'mastery_threshold': 3}
+    missing = [
+        GroupProgress(
+            user=user, group_number=group['group_number'], mastery_threshold=3,
+            words_total=group['total_words'], words_started=group['words_started'],
+            words_mastered=group['words_mastered'],
         )
+        for group in groups if group['group_number'] not in progress_by_group
+    ]
+    if missing:
+        GroupProgress.objects.bulk_create(missing, ignore_conflicts=True)
+        UserStats.bump_version(user.pk)
+        progress_by_group.update((gp.group_number, gp) for gp in missing)
 
-        # Update completion status
-        group_progress.check_and_update_completion()
+    result = []
+    for group in groups:
+        group_num = group['group_number']
+        group_progress = progress_by_group[group_num]
 
         result.append({
             'group_number': group_num,
-            'total_words': group_progress.words_total,
-            'words_started': group_progress.words_started,
-            'words_mastered': group_progress.words_mastered,
+            'total_words': group['total_words'],
+            'words_started': group['words_started'],
+            'words_mastered': group['words_mastered'],
             'is_completed': group_progress.is_completed,
             'completion_percentage': (
-                (group_progress.words_mastered / max(group_progress.words_total, 1)) * 100
+                (group['words_mastered'] / max(group['total_words'], 1)) * 100
             ),
             'mastery_threshold': group_progress.mastery_threshold,
             'started_at': group_progress.started_at,
@@ -822,57 +1332,206 @@ def groups_with_progress(request):
 # ============================================================================
 
 # Keep your existing endpoints for compatibility
+class WordCatalogPagination(LimitOffsetPagination):
+    """Opt-in: pages only when ?limit= is given, so old clients get the full list"""
+    max_limit = 1000
+
 class WordViewSet(viewsets.ModelViewSet):
+    """Word catalog CRUD
+
+    Reads accept ?fields=a,b to load and send only those columns, and the
+    list accepts ?shape=columnar for parallel arrays per field, ?limit=
+    and ?offset= for pages, and ?since=<version> for only the words changed
+    after a catalog version. Lists carry the current version in the
+    X-Catalog-Version header.
+    """
     queryset = Word.objects.all()
     serializer_class = WordSerializer
+    pagination_class = WordCatalogPagination
+
+    def read_fields(self):
+        if self.request.method != 'GET':
+            return None
+        return requested_fields(self.request, list(WordSerializer().fields))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.read_fields()
+        if fields:
+            queryset = queryset.only(*fields)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.read_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        # Read first - anything changed meanwhile is simply sent again
+        version = CatalogVersion.current()
+        since = request.query_params.get('since')
+        if since is not None:
+            response = self.delta(request, since, version)
+        elif wants_columnar(request):
+            response = self.columnar_list(self.filter_queryset(self.get_queryset()))
+        else:
+            response = super().list(request, *args, **kwargs)
+        response['X-Catalog-Version'] = str(version)
+        return response
+
+    def columnar_list(self, queryset):
+        fields = self.read_fields()
+        queryset = queryset.values(*fields)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(to_columns(page, fields))
+        rows = list(queryset)
+        return Response({'count': len(rows), 'columns': to_columns(rows, fields)})
+
+    def delta(self, request, since, version):
+        """Words changed and IDs deleted after catalog version `since`"""
+        try:
+            since = int(since)
+        except ValueError:
+            raise ValidationError({'since': 'Must be an integer catalog version'})
+        if since < CatalogChange.oldest_answerable():
+            return Response({
+                'error': 'Version too old for a delta - fetch the full catalog',
+                'version': version
+            }, status=status.HTTP_410_GONE)
+
+        changes = CatalogChange.objects.filter(version__gt=since)
+        words = self.get_queryset().filter(id__in=changes.values('word_id'))
+        deleted = changes.filter(deleted=True).exclude(
+            word_id__in=Word.objects.values('id')
+        ).values_list('word_id', flat=True).distinct()
+
+        if wants_columnar(request):
+            fields = self.read_fields()
+            updated = to_columns(list(words.values(*fields)), fields)
+        else:
+            updated = self.get_serializer(words, many=True).data
+        return Response({
+            'version': version,
+            'since': since,
+            'updated': updated,
+            'deleted': sorted(deleted),
+        })
 
 class MathQuestionViewSet(viewsets.ModelViewSet):
     queryset = MathQuestion.objects.all()
     serializer_class = MathQuestionSerializer
 
-@api_view(['POST'])
-def add_words_bulk(request):
-    input_data = request.data
-    if isinstance(input_data, dict):
-        input_data = [input_data]
-
-    result = {"added": [], "failed": []}
-
-    for word_data in input_data:
-        word_text = (word_data.get("word") or "").strip() or "(missing)"
-
-        if not word_data.get("word"):
-            result["failed"].append({
-                "word": word_text,
-                "reason": "Missing 'word' field"
-            })
-            continue
-
-        if Word.objects.filter(word__iexact=word_text).exists():
-            result["failed"].append({
-                "word": word_text,
-                "reason": "Word already exists"
-            })
+# Words per INSERT and per duplicate lookup in the bulk importer
+IMPORT_CHUNK = 500
+
+# A-Z -> a-z only: SQLite's LOWER() leaves every other character alone
+ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+def word_key(text):
+    """Case-folded word, folded exactly as the database's LOWER() does"""
+    text = str(text).strip()
+    if connection.vendor == 'sqlite':
+        return text.translate(ASCII_LOWER)
+    return text.lower()
+
+def existing_word_keys(keys):
+    """The word_key() values in keys that are already in the catalog
+
+    Served by the Lower('word') index, in chunks that stay under the
+    database's bound-parameter limit.
+    """
+    keys = list(keys)
+    size = min(IMPORT_CHUNK, connection.features.max_query_params or IMPORT_CHUNK)
+    found = set()
+    for start in range(0, len(keys), size):
+        found.update(
+            Word.objects.annotate(word_lower=Lower('word'))
+            .filter(word_lower__in=keys[start:start + size])
+            .values_list('word_lower', flat=True)
+        )
+    return found
+
+def import_words(items):
+    """Validate, dedupe and insert word dicts - the added/failed report
+
+    Everything is validated before anything is written; duplicates (in
+    the catalog or earlier in the batch) are found with one lookup, and
+    group numbers come from a single count.
+    """
+    outcomes = [None] * len(items)
+    keys = {}
+    for i, word_data in enumerate(items):
+        word_text = word_data.get("word") if isinstance(word_data, dict) else None
+        if not word_text:
+            outcomes[i] = {"word": "(missing)", "reason": "Missing 'word' field"}
+        else:
+            keys[i] = word_key(word_text)
+
+    existing = existing_word_keys(set(keys.values()))
+    base_count = Word.objects.count()
+    # One instance for every item - building the fields is most of the cost
+    validator = WordImportSerializer()
+    accepted, seen = [], set()
+    for i, key in keys.items():
+        word_data = items[i]
+        word_text = str(word_data["word"]).strip() or "(missing)"
+        if key in existing or key in seen:
+            outcomes[i] = {"word": word_text, "reason": "Word already exists"}
             continue
 
         # Auto-assign group number if not provided
         grp = word_data.get("group_number")
         if not isinstance(grp, int) or grp <= 0:
-            current_count = Word.objects.count() + len(result["added"])
-            next_group_num = (current_count // GROUP_SIZE) + 1
-            word_data["group_number"] = next_group_num
-
-        serializer = WordSerializer(data=word_data)
-        if serializer.is_valid():
-            serializer.save()
-            result["added"].append(word_text)
-        else:
-            result["failed"].append({
+            word_data = {**word_data,
+                         "group_number": (base_count + len(accepted)) // GROUP_SIZE + 1}
+
+        try:
+            validated = validator.run_validation(word_data)
+        except ValidationError as exc:
+            outcomes[i] = {
                 "word": word_text,
                 "reason": "Invalid field(s)",
-                "details": serializer.errors
-            })
+                "details": as_serializer_error(exc)
+            }
+            continue
+        accepted.append((i, Word(**validated)))
+        seen.add(key)
+        outcomes[i] = word_text
 
+    if accepted:
+        try:
+            with transaction.atomic():
+                created = Word.objects.bulk_create([word for _, word in accepted],
+                                                   batch_size=IMPORT_CHUNK)
+                # bulk_create skips the post_save receivers
+                notify_catalog_change(
+                    updated_ids=[word.id for word in created],
+                    group_numbers={word.group_number for word in created}
+                )
+        except IntegrityError:
+            # A duplicate slipped past the lookup (e.g. a concurrent import) -
+            # insert one by one so only the clashing words fail
+            for i, word in accepted:
+                word.pk = None
+                try:
+                    with transaction.atomic():
+                        word.save()
+                except IntegrityError:
+                    outcomes[i] = {"word": outcomes[i], "reason": "Word already exists"}
+
+    return {
+        "added": [o for o in outcomes if isinstance(o, str)],
+        "failed": [o for o in outcomes if isinstance(o, dict)],
+    }
+
+@api_view(['POST'])
+def add_words_bulk(request):
+    # New words get hard distractors once `manage.py build_neighbors` runs
+    input_data = request.data
+    if isinstance(input_data, dict):
+        input_data = [input_data]
+
+    result = import_words(list(input_data))
     status_code = status.HTTP_207_MULTI_STATUS if result["failed"] else status.HTTP_201_CREATED
     return Response(result, status=status_code)
 
@@ -892,14 +1551,18 @@ def mark_read(request):
     except Word.DoesNotExist:
         return Response({"detail": "Word not found"}, status=404)
 
-    uwp, _ = UserWordProgress.objects.get_or_create(
+    uwp, created = UserWordProgress.objects.get_or_create(
         user=user, word=word, defaults={"due_date": timezone.now()}
     )
+    if created:
+        UserStats.record_progress_changes(user.pk, [(None, uwp.snapshot())])
+        GroupProgress.record_changes(user.pk, word.group_number, [(None, uwp.mastery)])
 
     return Response(UserWordProgressSerializer(uwp).data, status=200)
 
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
+@conditional_on_progress
 def reviews_due(request):
     """Legacy endpoint - kept for compatibility"""
     user = get_active_user(request)
@@ -918,6 +1581,103 @@ def reviews_due(request):
 
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
+@conditional_on_progress
+def reviews_due_count(request):
+    """How many reviews are due - same rule as reviews/due/ and the stream"""
+    user = get_active_user(request)
+    count = UserWordProgress.objects.filter(user=user, due_date__lte=timezone.now()).count()
+    return Response({"count": count})
+
+# ============================================================================
+# DUE QUEUE STREAM - NDJSON, keyset-paged on (due_date, id)
+# ============================================================================
+
+# Rows fetched from the database cursor per round trip
+DUE_STREAM_CHUNK = 200
+
+DUE_CARD_FIELDS = [
+    'id', 'user', 'word', 'mastery', 'times_asked', 'times_correct',
+    'consecutive_correct', 'first_seen', 'last_practiced', 'due_date',
+    'interval_days', 'review_count', 'is_learning', 'marked_for_review',
+]
+
+def due_card_lines(rows, limit):
+    """One JSON card per line, then a {"next_cursor", "count"} trailer"""
+    last, count = None, 0
+    for row in rows.iterator(chunk_size=DUE_STREAM_CHUNK):
+        # Same keys as UserWordProgressSerializer
+        times_asked = row['times_asked']
+        row['accuracy_rate'] = (row['times_correct'] / times_asked) * 100 if times_asked else 0
+        row['is_due_for_review'] = True
+        yield json.dumps(row, cls=JSONEncoder) + '\n'
+        last, count = row, count + 1
+    more = limit is not None and count == limit
+    trailer = {'next_cursor': encode_cursor(last, DUE_CURSOR_KEY) if more else None,
+               'count': count}
+    yield json.dumps(trailer) + '\n'
+
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def reviews_due_stream(request):
+    """Due reviews as NDJSON, oldest first - replaces reviews/due/?limit=999
+
+    Cards are written as rows come off the database cursor, so the client
+    starts on the first ones straight away and server memory stays flat.
+    Optional ?limit= caps the page; the trailer's next_cursor (null at the
+    end) goes back as ?cursor= for the next one.
+    """
+    user = get_active_user(request)
+    # Checked up front - errors after the first line can't change the status
+    limit, cursor = request.GET.get('limit'), request.GET.get('cursor')
+    try:
+        limit = int(limit) if limit else None
+        if limit is not None and limit < 1:
+            raise ValueError('limit must be positive')
+    except ValueError:
+        return Response({'error': 'limit must be a positive integer'}, status=400)
+    try:
+        cursor = decode_cursor(cursor, DUE_CURSOR_KEY) if cursor else None
+    except ValueError:
+        return Response({'error': 'Invalid cursor'}, status=400)
+
+    rows = UserWordProgress.objects.filter(
+        user=user, due_date__lte=timezone.now()
+    ).order_by('due_date', 'id').values(
+        *DUE_CARD_FIELDS, word_text=F('word__word'), word_meaning=F('word__meaning')
+    )
+    if cursor:
+        rows = after_cursor(rows, cursor, DUE_CURSOR_KEY)
+    if limit is not None:
+        rows = rows[:limit]
+
+    response = StreamingHttpResponse(due_card_lines(rows, limit),
+                                     content_type='application/x-ndjson')
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def export_dataset(request, dataset, fmt):
+    """Streamed download: /api/export/words.csv, progress.ndjson, attempts.csv
+
+    Rows are encoded as they are read, so exports of any size use
+    constant memory. progress and attempts are the active user's.
+    """
+    if dataset not in DATASETS or fmt not in FORMATS:
+        return Response({'error': f'Unknown export {dataset}.{fmt}',
+                         'datasets': list(DATASETS), 'formats': list(FORMATS)},
+                        status=404)
+    user = get_active_user(request)
+    response = StreamingHttpResponse(export_lines(dataset, fmt, user),
+                                     content_type=FORMATS[fmt])
+    response['Content-Disposition'] = (
+        f'attachment; filename="vocab-{dataset}-{timezone.localdate():%Y%m%d}.{fmt}"'
+    )
+    return response
+
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+@conditional_on_progress
 def groups_summary(request):
     """Legacy endpoint - kept for compatibility"""
     user = get_active_user(request)
@@ -996,11 +1756,14 @@ def start_quiz_session(request):
     data = request.data
 
     # Create new-style session
-    session = QuizSession.objects.create(
+    session = QuizSession(
         user=user,
         quiz_type=data.get('quiz_type', 'adaptive_group'),
         group_number=data.get('group_number')
     )
+    build_question_plan(session)
+    session.save()
+    UserStats.bump_version(user.pk)
 
     return Response({
         'session_id': session.id,
@@ -1037,7 +1800,10 @@ class UserWordProgressListCreateView(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         user = get_active_user(self.request)
-        serializer.save(user=user)
+        progress = serializer.save(user=user)
+        UserStats.record_progress_changes(user.pk, [(None, progress.snapshot())])
+        GroupProgress.record_changes(user.pk, progress.word.group_number,
+                                     [(None, progress.mastery)])
 
 class UserWordProgressDetailView(generics.RetrieveUpdateAPIView):
     serializer_class = UserWordProgressSerializer
@@ -1047,6 +1813,13 @@ class UserWordProgressDetailView(generics.RetrieveUpdateAPIView):
         user = get_active_user(self.request)
         return UserWordProgress.objects.filter(user=user)
 
+    def perform_update(self, serializer):
+        before = serializer.instance.snapshot()
+        progress = serializer.save()
+        UserStats.record_progress_changes(progress.user_id, [(before, progress.snapshot())])
+        GroupProgress.record_changes(progress.user_id, progress.word.group_number,
+                                     [(before[0], progress.mastery)])
+
 class ReviewSessionListCreateView(generics.ListCreateAPIView):
     serializer_class = ReviewSessionSerializer
     permission_classes = [permissions.AllowAny]